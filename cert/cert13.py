@@ -1,13 +1,15 @@
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
 import qrcode
 import hashlib
 import random
 import math
-import os
 import base64
 
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes, serialization
+from certgen import fonts
+from certgen.effects import vertical_gradient
+from certgen.keystore import load_or_generate
+from certgen.stego import embed_message
+from certgen.signing import canonical_payload, encode_qr_payload, sign, RSA_PSS_SHA256, ED25519
 
 # تنظیمات
 CERT_WIDTH, CERT_HEIGHT = 900, 650
@@ -17,6 +19,7 @@ TITLE_COLOR = (20, 20, 20)
 TEXT_COLOR = (40, 40, 40)
 WATERMARK_COLOR = (60, 60, 60, 25)
 NOISE_INTENSITY = 10000
+SIGNATURE_SCHEME = RSA_PSS_SHA256  # یا ED25519 برای امضا و QR کوچک‌تر
 
 # اطلاعات گواهی
 cert_info = {
@@ -31,53 +34,15 @@ cert_info = {
     "Issuer": "OpenAI, Inc."
 }
 
-# ساخت کلیدهای RSA
-def generate_rsa_keys():
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    public_key = private_key.public_key()
-    return private_key, public_key
-
-# ذخیره کلیدها
-def save_rsa_keys(private_key, public_key):
-    with open("private_key.pem", "wb") as f:
-        f.write(private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
-            encryption_algorithm=serialization.NoEncryption()
-        ))
-    with open("public_key.pem", "wb") as f:
-        f.write(public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        ))
-
 # بارگذاری فونت ساده (می‌توان پیشرفته‌تر کرد)
 def load_font(name, size):
-    paths = [
-        name,
-        os.path.join("/usr/share/fonts/truetype/dejavu/", name),
-        os.path.join("/Library/Fonts/", name),
-        os.path.join("C:/Windows/Fonts/", name)
-    ]
-    for path in paths:
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            continue
-    return ImageFont.load_default()
+    # جستجو در ایندکس فونت‌های سیستم؛ در نبود فونت، فونت پیش‌فرض PIL
+    return fonts.load_font(name, size, fallbacks=())
 
 font_title = load_font("timesbd.ttf", 36)
 font_text = load_font("times.ttf", 18)
 font_small = load_font("times.ttf", 14)
 
-# ساخت گرادیانت پس‌زمینه
-def draw_gradient(draw, width, height, start_color, end_color):
-    for i in range(height):
-        r = int(start_color[0] + (float(i) / height) * (end_color[0] - start_color[0]))
-        g = int(start_color[1] + (float(i) / height) * (end_color[1] - start_color[1]))
-        b = int(start_color[2] + (float(i) / height) * (end_color[2] - start_color[2]))
-        draw.line([(0, i), (width, i)], fill=(r, g, b))
-
 # ساخت QR code
 def create_qr_code(data, size=180):
     qr = qrcode.QRCode(box_size=8, border=3)
@@ -87,43 +52,25 @@ def create_qr_code(data, size=180):
     qr_img = qr_img.resize((size, size), Image.Resampling.LANCZOS)
     return qr_img
 
-def encode_message_in_pixels(img, message):
-    binary_message = ''.join(format(ord(i), '08b') for i in message)
-    pixels = img.load()
-    width, height = img.size
-    idx = 0
-    for y in range(height):
-        for x in range(width):
-            if idx >= len(binary_message):
-                return
-            r, g, b, a = pixels[x, y]
-            r = (r & ~1) | int(binary_message[idx])
-            pixels[x, y] = (r, g, b, a)
-            idx += 1
-
 def main():
-    private_key, public_key = generate_rsa_keys()
-    save_rsa_keys(private_key, public_key)
+    # کلید فقط بار اول ساخته می‌شود؛ verifier همین public_key.pem را می‌خواند
+    if SIGNATURE_SCHEME == ED25519:
+        keys = load_or_generate(algorithm="ed25519")
+    else:
+        keys = load_or_generate("private_key.pem", "public_key.pem", key_size=2048)
 
     # داده‌های برای امضا
-    data_string = "\n".join(f"{k}: {v}" for k, v in cert_info.items()).encode('utf-8')
-
-    digital_signature_bytes = private_key.sign(
-        data_string,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
+    data_string = canonical_payload(cert_info)
+
+    digital_signature_bytes = sign(keys.private_key, data_string, SIGNATURE_SCHEME)
     digital_signature = base64.b64encode(digital_signature_bytes).decode('utf-8')
     verification_code = f"VER-{hashlib.sha256(data_string).hexdigest()[:8].upper()}-{cert_info['Certificate ID'][-4:]}"
 
-    qr_img = create_qr_code(digital_signature, size=180)
+    qr_payload = encode_qr_payload(digital_signature, verification_code, keys.key_id, SIGNATURE_SCHEME)
+    qr_img = create_qr_code(qr_payload, size=180)
 
-    certificate = Image.new("RGBA", (CERT_WIDTH, CERT_HEIGHT), BACKGROUND_COLOR)
+    certificate = vertical_gradient(CERT_WIDTH, CERT_HEIGHT, (255, 255, 250), (220, 230, 255)).convert("RGBA")
     draw = ImageDraw.Draw(certificate)
-    draw_gradient(draw, CERT_WIDTH, CERT_HEIGHT, (255, 255, 250), (220, 230, 255))
 
     title_text = "OpenAI – Certificate of Membership"
     w, h = draw.textsize(title_text, font=font_title)
@@ -151,7 +98,7 @@ def main():
 
     # درج پیام مخفی استگانوگرافی (CertificateID و VerificationCode)
     hidden_message = f"CertificateID:{cert_info['Certificate ID']};VerificationCode:{verification_code}"
-    encode_message_in_pixels(certificate, hidden_message)
+    certificate = embed_message(certificate, hidden_message)
 
     output_file = "openai_certificate_yasin_realistic2.png"
     certificate.convert("RGB").save(output_file, quality=95)
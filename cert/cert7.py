@@ -2,7 +2,9 @@ from PIL import Image, ImageDraw, ImageFont
 import math
 import qrcode
 import hashlib
-import random
+
+from certgen.noise import apply_noise
+from certgen.watermark import apply_watermarks
 
 # ===== Certificate Info =====
 name = "Yasin"
@@ -156,38 +158,17 @@ watermark_texts = [
 
 wm_font = font_small
 
-for _ in range(50):
-    text = random.choice(watermark_texts)
-    # Random position over whole certificate
-    x = random.randint(0, width-100)
-    y = random.randint(0, height-20)
-    # Very faint gray with opacity 30 (almost invisible)
-    alpha = 20
-    color = (50, 50, 50, alpha)
-
-    # Create transparent text image
-    txt_img = Image.new("RGBA", (150, 20), (255, 255, 255, 0))
-    txt_draw = ImageDraw.Draw(txt_img)
-    txt_draw.text((0, 0), text, font=wm_font, fill=color)
-    # Rotate text randomly small angle
-    angle = random.uniform(-15, 15)
-    txt_img = txt_img.rotate(angle, expand=1)
-
-    # Paste watermark text on certificate (with transparency mask)
-    certificate.paste(txt_img, (x, y), txt_img)
+# Very faint gray with opacity 20 (almost invisible), small random angle,
+# random position over whole certificate
+certificate = apply_watermarks(
+    certificate, watermark_texts, 50, wm_font,
+    fill=(50, 50, 50, 20), angle_range=(-15, 15), box=(150, 20), offset=(0, 0),
+    region=(0, 0, width-100, height-20), resample=Image.NEAREST)
 
 # ==== Add subtle pixel noise for anti-forgery ====
 
-pixels = certificate.load()
-for _ in range(800):  # Number of pixels to modify
-    px = random.randint(0, width-1)
-    py = random.randint(0, height-1)
-    r, g, b = pixels[px, py]
-    # Slight noise, add or subtract 1 to 3 from each channel randomly within bounds 0-255
-    r = max(0, min(255, r + random.randint(-3, 3)))
-    g = max(0, min(255, g + random.randint(-3, 3)))
-    b = max(0, min(255, b + random.randint(-3, 3)))
-    pixels[px, py] = (r, g, b)
+# Slight noise, -3..3 on each channel independently, seeded from the certificate ID
+certificate = apply_noise(certificate, certificate_id, 800, amplitude=3, per_channel=True)
 
 # Save certificate image
 certificate.save("openai_certificate_yasin_en_2_watermarked.png")
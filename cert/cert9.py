@@ -1,9 +1,12 @@
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
+from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 import qrcode
 import hashlib
-import random
 import math
-import os
+
+from certgen import fonts
+from certgen.effects import vertical_gradient
+from certgen.noise import apply_noise
+from certgen.watermark import apply_watermarks
 
 # ======== تنظیمات قابل تغییر ========
 CERT_WIDTH, CERT_HEIGHT = 900, 550
@@ -29,19 +32,8 @@ cert_info = {
 
 # ======== تابع بارگذاری فونت پویا با fallback ========
 def load_font(name, size):
-    paths = [
-        name,
-        os.path.join("/usr/share/fonts/truetype/dejavu/", name),
-        os.path.join("/Library/Fonts/", name),
-        os.path.join("C:/Windows/Fonts/", name)
-    ]
-    for path in paths:
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            continue
-    # فونت پیش‌فرض PIL
-    return ImageFont.load_default()
+    # جستجو در ایندکس فونت‌های سیستم؛ در نبود فونت، فونت پیش‌فرض PIL
+    return fonts.load_font(name, size, fallbacks=())
 
 # فونت‌ها
 font_title = load_font("arialbd.ttf", 36)
@@ -65,14 +57,6 @@ def create_qr_code(data, size=180):
 
 qr_img = create_qr_code(digital_signature, size=180)
 
-# ======== طراحی پس‌زمینه با گرادیانت ملایم ========
-def draw_gradient(draw, width, height, start_color, end_color):
-    for i in range(height):
-        r = int(start_color[0] + (float(i) / height) * (end_color[0] - start_color[0]))
-        g = int(start_color[1] + (float(i) / height) * (end_color[1] - start_color[1]))
-        b = int(start_color[2] + (float(i) / height) * (end_color[2] - start_color[2]))
-        draw.line([(0, i), (width, i)], fill=(r, g, b))
-
 # ======== رسم مهر رسمی با افکت سه‌بعدی ========
 def create_official_seal(diameter=160):
     seal = Image.new("RGBA", (diameter, diameter), (0, 0, 0, 0))
@@ -131,11 +115,9 @@ def create_official_seal(diameter=160):
 official_seal = create_official_seal()
 
 # ======== ایجاد تصویر گواهی ========
-certificate = Image.new("RGBA", (CERT_WIDTH, CERT_HEIGHT), BACKGROUND_COLOR)
-draw = ImageDraw.Draw(certificate)
-
 # گرادیانت پس زمینه ملایم
-draw_gradient(draw, CERT_WIDTH, CERT_HEIGHT, (255, 255, 250), (230, 240, 255))
+certificate = vertical_gradient(CERT_WIDTH, CERT_HEIGHT, (255, 255, 250), (230, 240, 255)).convert("RGBA")
+draw = ImageDraw.Draw(certificate)
 
 # قاب حاشیه‌ای چند لایه
 for i, thickness in enumerate([6, 4, 2]):
@@ -200,30 +182,16 @@ watermarks = [
 ]
 
 # ======== اضافه کردن واترمارک نامرئی با فونت کوچک و زاویه تصادفی ========
-for _ in range(80):  # تعداد را کمی بیشتر کردم
-    wm_text = random.choice(watermarks)
-    txt_img = Image.new("RGBA", (220, 20), (0, 0, 0, 0))
-    txt_draw = ImageDraw.Draw(txt_img)
-    txt_draw.text((0, 0), wm_text, font=font_small, fill=WATERMARK_COLOR)
-    angle = random.uniform(-25, 25)
-    txt_img = txt_img.rotate(angle, expand=1)
-
-    # موقعیت تصادفی اما دور از لبه‌ها
-    x = random.randint(MARGIN + 10, CERT_WIDTH - 230)
-    y = random.randint(MARGIN + 10, CERT_HEIGHT - 30)
-    certificate.paste(txt_img, (x, y), txt_img)
+# موقعیت تصادفی اما دور از لبه‌ها
+certificate = apply_watermarks(
+    certificate, watermarks, 80, font_small,  # تعداد را کمی بیشتر کردم
+    fill=WATERMARK_COLOR, angle_range=(-25, 25), box=(220, 20), offset=(0, 0),
+    region=(MARGIN + 10, MARGIN + 10, CERT_WIDTH - 230, CERT_HEIGHT - 30),
+    resample=Image.NEAREST)
 
 # ======== اضافه کردن نویز پیکسلی برای ضد جعل ========
-pixels = certificate.load()
-for _ in range(NOISE_INTENSITY):
-    px = random.randint(0, CERT_WIDTH - 1)
-    py = random.randint(0, CERT_HEIGHT - 1)
-    r, g, b, a = pixels[px, py]
-    noise = random.randint(-5, 5)
-    r = max(0, min(255, r + noise))
-    g = max(0, min(255, g + noise))
-    b = max(0, min(255, b + noise))
-    pixels[px, py] = (r, g, b, a)
+# میدان نویز از Certificate ID ساخته می‌شود تا verifier بتواند آن را بررسی کند
+certificate = apply_noise(certificate, cert_info["Certificate ID"], NOISE_INTENSITY, amplitude=5)
 
 # ======== ذخیره فایل نهایی ========
 output_file = "openai_certificate_yasin_professional.png"
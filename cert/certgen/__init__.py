@@ -0,0 +1,32 @@
+# ابزارهای مشترک ساخت گواهی (نسخه قابل import از cert12.py)
+# نام‌های عمومی تنبل بارگذاری می‌شوند تا `import certgen` عملاً هزینه‌ای نداشته باشد؛
+# رابط صدور گواهی certgen.api.render است (certgen.render نام زیرماژول رسم است).
+import importlib
+
+_EXPORTS = {
+    "Certificate": ".api",
+    "signing_key": ".api",
+    "render_certificate": ".render",
+    "save_certificate": ".render",
+    "normalize_cert_info": ".render",
+    "default_cert_info": ".render",
+    "load_template": ".template",
+    "render_pdf": ".pdf",
+    "issue_batch": ".batch",
+    "load_or_generate": ".keystore",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,73 @@
+import argparse
+import importlib
+import json
+import sys
+
+# ======== Command Line ========
+# python -m certgen یک گواهی صادر می‌کند؛ python -m certgen <command> ... به main همان
+# ماژول می‌رود. فقط ماژول لازم import می‌شود تا شروع CLI سریع بماند.
+COMMANDS = {
+    "batch": "batch",
+    "verify": "verify",
+    "serve": "service",
+    "pdf": "pdf",
+    "template": "template",
+    "revocation": "revocation",
+    "encoders": "output",
+    "bench": "bench",
+}
+
+# همان مقادیر signing.SCHEMES و output؛ اینجا تکرار شده‌اند تا --help بدون cryptography و Pillow اجرا شود
+SCHEMES = ("rsa-pss-sha512", "rsa-pss-sha256", "ed25519")
+FORMATS = ("png", "png-fast", "png-small", "webp", "webp-small", "jpeg", "pdf")
+
+
+def _field(text):
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    return key, value
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        module = importlib.import_module(f".{COMMANDS[argv[0]]}", __package__)
+        return module.main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        prog="python -m certgen",
+        description="Issue one certificate. Other tools: " + ", ".join(
+            f"python -m certgen {name}" for name in COMMANDS) + ".")
+    parser.add_argument("-f", "--field", action="append", type=_field, default=[], metavar="KEY=VALUE",
+                        help="cert_info field (repeatable, e.g. -f 'Name=Yasin')")
+    parser.add_argument("-r", "--record", help="JSON file with the cert_info record")
+    parser.add_argument("--scheme", choices=SCHEMES, default=None,
+                        help="signature scheme (default: rsa-pss-sha512, or the key's own scheme)")
+    parser.add_argument("--key", help="signing key (created if missing; default depends on --scheme)")
+    parser.add_argument("--public-key")
+    parser.add_argument("-t", "--template", default=None, help="layout template name or .json/.yaml file")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("-o", "--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    from .api import render, signing_key
+    from .render import default_cert_info
+
+    record = {}
+    if args.record:
+        with open(args.record, encoding="utf-8") as f:
+            record = json.load(f)
+    record.update(args.field)
+    if not record:
+        record = default_cert_info()
+
+    keys = signing_key(args.scheme, args.key, args.public_key)
+    certificate = render(record, keys.private_key, args.scheme, args.template, args.format, args.output_dir)
+    print(f"✅ Professional certificate created: {certificate.path}", file=sys.stderr)
+    print(f"🔑 Signed with key {keys.key_id} ({certificate.verification_code})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
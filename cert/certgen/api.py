@@ -0,0 +1,50 @@
+import collections
+import os
+
+# ======== Library API ========
+# رابط یک‌خطی برای صدور گواهی از کد دیگر. هیچ کاری در زمان import انجام نمی‌شود:
+# Pillow، qrcode و cryptography در اولین فراخوانی import می‌شوند و کلید، فونت‌ها،
+# قالب کامپایل‌شده و لایه ثابت هم در همان زمان ساخته و برای پروسه نگه داشته می‌شوند.
+Certificate = collections.namedtuple(
+    "Certificate", "cert_info image pdf digital_signature verification_code path")
+
+
+def signing_key(scheme=None, private_key_path=None, public_key_path=None):
+    """KeyPair for `scheme`, loaded (or generated) on first use and then kept resident."""
+    from .keystore import load_or_generate
+    from .signing import key_algorithm
+
+    return load_or_generate(private_key_path, public_key_path, algorithm=key_algorithm(scheme))
+
+
+def render(cert_info, private_key=None, scheme=None, template=None, mode=None, output_dir=None,
+           final_filter=None):
+    """Issue one certificate and return a Certificate.
+
+    `cert_info` is completed like a batch record (default fields, a leased
+    Certificate ID when missing). Without `private_key` the default key for
+    `scheme` is used. `mode` is an output.OUTPUT_MODES name or "pdf"; the
+    result carries either `image` (PIL) or `pdf` (bytes). With `output_dir`
+    the certificate is also written there and `path` is set.
+    """
+    from .output import DEFAULT_MODE, PDF_MODE
+    from .render import FINAL_FILTER, normalize_cert_info, render_certificate, save_certificate
+
+    cert_info = normalize_cert_info(cert_info)
+    if private_key is None:
+        private_key = signing_key(scheme).private_key
+    mode = mode or DEFAULT_MODE
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if mode == PDF_MODE:
+        from .pdf import render_pdf, save_pdf
+
+        data, digital_signature, verification_code = render_pdf(cert_info, private_key, scheme, template)
+        path = save_pdf(data, cert_info, output_dir) if output_dir is not None else None
+        return Certificate(cert_info, None, data, digital_signature, verification_code, path)
+
+    image, digital_signature, verification_code = render_certificate(
+        cert_info, private_key, scheme, final_filter or FINAL_FILTER, template)
+    path = save_certificate(image, cert_info, output_dir, mode) if output_dir is not None else None
+    return Certificate(cert_info, image, None, digital_signature, verification_code, path)
@@ -0,0 +1,246 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .ids import IdAllocator, ID_DB_PATH
+from . import instrument
+from .keystore import load_or_generate
+from .output import BackgroundWriter, OUTPUT_MODES, DEFAULT_MODE, PDF_MODE
+from .pdf import render_pdf
+from .records import iter_records
+from .registry import Registry
+from .render import certificate_filename, normalize_cert_info, render_certificate
+from .signing import key_algorithm, SCHEMES, DEFAULT_SCHEME
+from .template import load_template, DEFAULT_TEMPLATE
+
+# ======== Worker Process ========
+_worker = {}
+
+
+def _load_key(settings):
+    return load_or_generate(settings["private_key_path"], settings["public_key_path"],
+                            algorithm=key_algorithm(settings["scheme"]))
+
+
+def _init_worker(settings):
+    # هر worker کلید ذخیره‌شده را یک بار بارگذاری می‌کند
+    keys = _load_key(settings)
+    _worker.update(settings, key=keys.private_key, key_id=keys.key_id)
+    # قالب یک بار برای هر worker کامپایل می‌شود
+    _worker["template"] = load_template(settings["template"])
+    # هر worker بلوک شناسه خودش را اجاره می‌کند؛ صدور شناسه بدون قفل مشترک
+    _worker["ids"] = IdAllocator(settings["id_db"])
+    # شناسه هر رکورد پیش از رسم در registry رزرو می‌شود تا گواهی ثبت‌شده بازنویسی نشود
+    _worker["registry"] = Registry(settings["registry"]) if settings["registry"] else None
+    # ذخیره فایل در thread پس‌زمینه تا رسم گواهی بعدی منتظر encoder نماند
+    _worker["writer"] = BackgroundWriter(settings["output_mode"])
+    # پروسه‌های fork شده وضعیت random والد را به ارث می‌برند
+    random.seed()
+    # آمار هر worker پس از هر chunk برای والد فرستاده و صفر می‌شود
+    instrument.enable_mode(settings["instrument"])
+    instrument.RECORDER.reset()
+
+
+def _error(status, e):
+    status["status"] = "error"
+    status["error"] = f"{type(e).__name__}: {e}"
+    status.pop("_record", None)
+
+
+def _render_one(index, record, output_dir):
+    """Render and queue the encode of one record; returns (status, encode future or None)."""
+    start = time.perf_counter()
+    status = {"index": index, "certificate_id": record.get("Certificate ID")}
+    future = None
+    reserved = None
+    with instrument.span("record"):
+        try:
+            cert_info = normalize_cert_info(record, _worker["ids"].next_id)
+            status["certificate_id"] = cert_info["Certificate ID"]
+            if _worker["registry"] is not None:
+                # فایل گواهی قبلی دست نمی‌خورد؛ رکورد به عنوان خطا گزارش می‌شود
+                if not _worker["registry"].reserve(cert_info["Certificate ID"]):
+                    raise ValueError(f"Certificate ID {cert_info['Certificate ID']} is already registered")
+                reserved = cert_info["Certificate ID"]
+            status["output"] = certificate_filename(cert_info, output_dir, _worker["output_mode"])
+            if _worker["output_mode"] == PDF_MODE:
+                # PDF برداری مستقیم از قالب ساخته می‌شود و encode جداگانه ندارد
+                data, digital_signature, verification_code = render_pdf(
+                    cert_info, _worker["key"], _worker["scheme"], _worker["template"])
+                with open(status["output"], "wb") as f:
+                    f.write(data)
+            else:
+                certificate, digital_signature, verification_code = render_certificate(
+                    cert_info, _worker["key"], _worker["scheme"], template=_worker["template"])
+                future = _worker["writer"].submit(certificate, status["output"])
+            status["verification_code"] = verification_code
+            status["status"] = "ok"
+            # برای ثبت در registry؛ issue_batch آن را از وضعیت خروجی جدا می‌کند
+            status["_record"] = (cert_info, digital_signature, verification_code,
+                                 _worker["key_id"], _worker["scheme"], status["output"])
+        except Exception as e:
+            if reserved is not None:
+                _worker["registry"].release(reserved)
+            _error(status, e)
+    status["seconds"] = round(time.perf_counter() - start, 4)
+    return status, future
+
+
+def issue_chunk(items, output_dir):
+    """Issue [(index, record), ...]; each encode overlaps with rendering the next record."""
+    rendered = [_render_one(index, record, output_dir) for index, record in items]
+    statuses = []
+    for status, future in rendered:
+        if future is not None:
+            try:
+                status["encode_seconds"] = round(future.result(), 4)
+            except Exception as e:
+                _error(status, e)
+        statuses.append(status)
+    if statuses and instrument.enabled():
+        # مثل _record؛ issue_batch آن را برمی‌دارد و در RECORDER والد ادغام می‌کند
+        statuses[-1]["_metrics"] = instrument.RECORDER.snapshot()
+        instrument.RECORDER.reset()
+    return statuses
+
+
+def issue_one(index, record, output_dir):
+    return issue_chunk([(index, record)], output_dir)[0]
+
+# ======== Batch Driver ========
+def issue_batch(records, output_dir=".", workers=None, max_pending=None,
+                scheme=DEFAULT_SCHEME, private_key_path=None, public_key_path=None,
+                registry=None, id_db=ID_DB_PATH, output_mode=DEFAULT_MODE, chunk_size=8,
+                template=DEFAULT_TEMPLATE):
+    """Render `records` across a process pool, yielding one status dict per record.
+
+    Records are pulled from the iterable only as workers free up, so memory
+    stays bounded by `max_pending` chunks of `chunk_size` regardless of input
+    size. Within a chunk each file is encoded on a background thread while
+    the next record renders. Statuses are yielded in completion order;
+    `index` is the record's position in the input.
+    Issued certificates are added to `registry` (a Registry) when given.
+    Each Certificate ID is reserved in it before rendering, so a record
+    whose ID is already registered is reported as an error and its
+    existing file is left untouched.
+    Records without a Certificate ID get one leased from `id_db`.
+    `template` is a template name or file (see certgen.template).
+    When certgen.instrument is enabled, workers' stage histograms are merged
+    into instrument.RECORDER as chunks complete.
+    """
+    def finished(future):
+        for status in future.result():
+            record = status.pop("_record", None)
+            metrics = status.pop("_metrics", None)
+            if metrics:
+                instrument.RECORDER.merge(metrics)
+            if registry is not None and record is not None:
+                registry.add(*record)
+            yield status
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    os.makedirs(output_dir, exist_ok=True)
+
+    settings = {
+        "scheme": scheme,
+        "private_key_path": private_key_path,
+        "public_key_path": public_key_path,
+        "id_db": id_db,
+        "output_mode": output_mode,
+        "template": template,
+        "registry": registry.path if registry is not None else None,
+        "instrument": instrument.mode(),
+    }
+    # کلید پیش از شروع workerها ساخته می‌شود تا فقط یک بار تولید شود
+    _load_key(settings)
+    # خطای قالب پیش از راه‌اندازی pool گزارش می‌شود؛ workerهای fork شده نسخه کامپایل‌شده را به ارث می‌برند
+    load_template(template)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings,)) as pool:
+        pending = set()
+        items = enumerate(records)
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                break
+            pending.add(pool.submit(issue_chunk, chunk, output_dir))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from finished(future)
+        for future in wait(pending).done:
+            yield from finished(future)
+        if registry is not None:
+            registry.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Issue certificates in batch from CSV/JSONL records.")
+    parser.add_argument("records", help="CSV (with header) or JSONL file of cert_info records")
+    parser.add_argument("-o", "--output-dir", default="certificates")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--status", help="write per-record status JSONL here instead of stdout")
+    parser.add_argument("--scheme", choices=SCHEMES, default=DEFAULT_SCHEME)
+    parser.add_argument("--key", help="signing key (created if missing; default depends on --scheme)")
+    parser.add_argument("--public-key")
+    parser.add_argument("--registry", help="SQLite registry to record issued certificates in")
+    parser.add_argument("--id-db", default=ID_DB_PATH,
+                        help="Certificate ID allocation database (for records without an ID)")
+    parser.add_argument("--format", choices=sorted(OUTPUT_MODES) + [PDF_MODE], default=DEFAULT_MODE,
+                        help="output encoder mode (see python -m certgen.output) or pdf for vector output")
+    parser.add_argument("--chunk-size", type=int, default=8, help="records per worker task")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE,
+                        help="layout template name in templates/ or a .json/.yaml file")
+    parser.add_argument("--metrics", help="write per-stage timing histograms here (.prom: Prometheus text, else JSON)")
+    parser.add_argument("--metrics-memory", action="store_true",
+                        help="also record each stage's tracemalloc peak (slower)")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        instrument.enable(memory=args.metrics_memory)
+
+    out = open(args.status, "w", encoding="utf-8") if args.status else sys.stdout
+    registry = Registry(args.registry) if args.registry else None
+    counts = {"ok": 0, "error": 0}
+    start = time.perf_counter()
+    try:
+        for status in issue_batch(iter_records(args.records), args.output_dir, args.workers,
+                                  scheme=args.scheme, private_key_path=args.key,
+                                  public_key_path=args.public_key, registry=registry,
+                                  id_db=args.id_db, output_mode=args.format,
+                                  chunk_size=args.chunk_size, template=args.template):
+            counts[status["status"]] += 1
+            out.write(json.dumps(status, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if registry is not None:
+            registry.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {counts['ok']} issued, ❌ {counts['error']} failed in {elapsed:.1f}s",
+          file=sys.stderr)
+    if args.metrics:
+        instrument.write_metrics(args.metrics)
+        for stage, count, mean_ms, max_ms, peak_mib in instrument.summary():
+            peak = f", peak {peak_mib:.1f} MiB" if peak_mib is not None else ""
+            print(f"  {stage:<14} {count:>6} × {mean_ms:8.1f} ms (max {max_ms:.1f}{peak})", file=sys.stderr)
+    conflicts = registry.conflicts if registry is not None else []
+    if conflicts:
+        # فقط وقتی رخ می‌دهد که شناسه پس از رزرو، بیرون از این batch ثبت شده باشد
+        print(f"⚠️ {len(conflicts)} Certificate IDs were already registered and not recorded again: "
+              f"{', '.join(conflicts[:10])}{' …' if len(conflicts) > 10 else ''}", file=sys.stderr)
+    return 1 if counts["error"] or conflicts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
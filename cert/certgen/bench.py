@@ -0,0 +1,400 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+# ======== Pipeline Benchmarks ========
+# هر مرحله ساخت گواهی جداگانه زمان‌گیری و با baseline ذخیره‌شده مقایسه می‌شود؛
+# کندشدن بیش از آستانه درصدی یا تفاوت تصویر با نسخه طلایی، خروجی را ناموفق می‌کند.
+# نبودن baseline یا تصویر طلایی هم شکست است؛ فقط --update آن‌ها را می‌سازد.
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+THRESHOLD = 20.0
+REPEAT = 5
+BATCH_SIZE = 16
+PIXEL_TOLERANCE = 1
+MAX_DIFF_FRACTION = 0.0005
+
+# ورودی‌های ثابت تا خروجی بین اجراها قابل مقایسه باشد
+GOLDEN_KEY_SEED = bytes(range(32))
+GOLDEN_RANDOM_SEED = 2023
+GOLDEN_RECORD = {
+    "Name": "Yasin",
+    "Last Name": "Aryanfard",
+    "User ID": "YSNRFD",
+    "Membership Date": "April 1, 2023",
+    "Issued Date": "April 1, 2025",
+    "Certificate ID": "OPENAI-YSN-APR2023-CERT00001",
+}
+
+
+def golden_key():
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    return ed25519.Ed25519PrivateKey.from_private_bytes(GOLDEN_KEY_SEED)
+
+
+def golden_cert_info():
+    from .render import normalize_cert_info
+    return normalize_cert_info(GOLDEN_RECORD)
+
+
+def environment():
+    """What the timings and golden images depend on besides the code."""
+    import PIL
+    from .template import _font_id, load_template
+
+    template = load_template()
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "fonts": {name: _font_id(font) for name, font in sorted(template.fonts.items())},
+    }
+
+# ======== Stages ========
+# هر مرحله یک تابع آماده‌سازی است که تابع زمان‌گیری‌شده را برمی‌گرداند؛
+# آماده‌سازی در زمان اندازه‌گیری حساب نمی‌شود.
+STAGES = {}
+
+
+def stage(name, repeat=None):
+    def register(setup):
+        STAGES[name] = (setup, repeat)
+        return setup
+    return register
+
+
+def _record_context():
+    from .template import load_template
+
+    template = load_template()
+    cert_info = golden_cert_info()
+    return template, cert_info, template.record_context(cert_info, golden_key())
+
+
+@stage("keygen-rsa", repeat=3)
+def _keygen_rsa():
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    return lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@stage("keygen-ed25519")
+def _keygen_ed25519():
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    return ed25519.Ed25519PrivateKey.generate
+
+
+@stage("sign")
+def _sign():
+    from .render import sign_cert_info
+    key, cert_info = golden_key(), golden_cert_info()
+    return lambda: sign_cert_info(key, cert_info)
+
+
+@stage("base")
+def _base():
+    from .render import create_certificate_base
+    return create_certificate_base
+
+
+@stage("seal")
+def _seal():
+    from .render import create_official_seal
+    from .template import load_template
+    font = load_template().fonts["seal"]
+    return lambda: create_official_seal(font_seal=font)
+
+
+@stage("qr")
+def _qr():
+    from .render import create_qr_code
+    context = _record_context()[2]
+    return lambda: create_qr_code(context["qr_payload"])
+
+
+@stage("static-layer")
+def _static_layer():
+    template, cert_info, _ = _record_context()
+    return lambda: template.build_static_layer(cert_info)
+
+
+@stage("watermarks")
+def _watermarks():
+    from .watermark import apply_watermarks
+    template, cert_info, context = _record_context()
+    layer = template.static_layer(cert_info)
+    options = template.watermark_options(context)
+    apply_watermarks(layer, **options)
+    return lambda: apply_watermarks(layer, **options)
+
+
+def _filter_stage(mode):
+    def setup():
+        from .effects import smooth_sharpen
+        template, cert_info, _ = _record_context()
+        layer = template.static_layer(cert_info)
+        return lambda: smooth_sharpen(layer, mode)
+    return setup
+
+
+stage("filter-fused")(_filter_stage("fused"))
+stage("filter-legacy")(_filter_stage("legacy"))
+
+
+@stage("noise")
+def _noise():
+    from .noise import apply_noise
+    template, cert_info, _ = _record_context()
+    layer = template.static_layer(cert_info)
+    count = template.spec["noise"]["count"]
+    return lambda: apply_noise(layer, cert_info["Certificate ID"], count)
+
+
+def _save_stage(mode):
+    def setup():
+        from .output import encode
+        image = _render_golden("fused")
+        return lambda: encode(image, io.BytesIO(), mode)
+    return setup
+
+
+for _mode in ("png", "png-fast", "webp", "jpeg"):
+    stage(f"save-{_mode}")(_save_stage(_mode))
+
+
+@stage("pdf")
+def _pdf():
+    from .pdf import render_pdf
+    key, cert_info = golden_key(), golden_cert_info()
+    return lambda: render_pdf(cert_info, key)
+
+
+@stage("render")
+def _render():
+    from .render import render_certificate
+    key, cert_info = golden_key(), golden_cert_info()
+    return lambda: render_certificate(cert_info, key)
+
+
+@stage("issue-single")
+def _issue_single():
+    from .output import encode
+    from .render import render_certificate
+    key, cert_info = golden_key(), golden_cert_info()
+    return lambda: encode(render_certificate(cert_info, key)[0], io.BytesIO())
+
+
+@stage("issue-batch", repeat=2)
+def _issue_batch():
+    from cryptography.hazmat.primitives import serialization
+    from .batch import issue_batch
+
+    # پوشه موقت با run زنده می‌ماند و وقتی time_stage آن را رها کرد پاک می‌شود
+    tmp = tempfile.TemporaryDirectory(prefix="certgen-bench-")
+    workdir = tmp.name
+    key_path = os.path.join(workdir, "key.pem")
+    with open(key_path, "wb") as f:
+        f.write(golden_key().private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    records = [dict(GOLDEN_RECORD, **{"Certificate ID": f"OPENAI-BENCH-{i:05d}"}) for i in range(BATCH_SIZE)]
+
+    def run(tmp=tmp):
+        statuses = list(issue_batch(records, os.path.join(workdir, "out"), scheme="ed25519",
+                                    private_key_path=key_path,
+                                    public_key_path=os.path.join(workdir, "key.pub.pem"),
+                                    id_db=os.path.join(workdir, "ids.sqlite3")))
+        failed = [s for s in statuses if s["status"] != "ok"]
+        if failed:
+            raise RuntimeError(f"batch issuance failed: {failed[0].get('error')}")
+    return run
+
+
+def time_stage(name, repeat=REPEAT):
+    """{"min_ms", "median_ms", "runs"} for one stage (one untimed warm-up run first)."""
+    setup, stage_repeat = STAGES[name]
+    run = setup()
+    run()
+    runs = []
+    for _ in range(min(repeat, stage_repeat or repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": round(min(runs), 3), "median_ms": round(statistics.median(runs), 3), "runs": len(runs)}
+
+# ======== Golden Images ========
+def _render_golden(final_filter):
+    from .render import render_certificate
+
+    random.seed(GOLDEN_RANDOM_SEED)
+    return render_certificate(golden_cert_info(), golden_key(), final_filter=final_filter)[0]
+
+
+GOLDEN_CASES = {
+    "render-fused": lambda: _render_golden("fused"),
+    "render-layers": lambda: _render_golden("layers"),
+    "render-legacy": lambda: _render_golden("legacy"),
+    "static-layer": lambda: _record_context()[0].build_static_layer(golden_cert_info()),
+}
+
+
+def compare_images(expected, actual, tolerance=PIXEL_TOLERANCE):
+    """(max channel difference, fraction of pixels differing by more than `tolerance`)."""
+    if expected.size != actual.size:
+        return 255, 1.0
+    mode = "RGBA" if "A" in expected.mode or "A" in actual.mode else "RGB"
+    a = np.asarray(expected.convert(mode), dtype=np.int16)
+    b = np.asarray(actual.convert(mode), dtype=np.int16)
+    diff = np.abs(a - b).max(axis=-1)
+    return int(diff.max()), float((diff > tolerance).mean())
+
+
+def check_golden(golden_dir=GOLDEN_DIR, cases=None, tolerance=PIXEL_TOLERANCE,
+                 max_fraction=MAX_DIFF_FRACTION, update=False):
+    """{case: {"status": "ok"|"mismatch"|"missing"|"updated", ...}} against the stored PNGs."""
+    results = {}
+    for case in cases or GOLDEN_CASES:
+        path = os.path.join(golden_dir, f"{case}.png")
+        image = GOLDEN_CASES[case]()
+        if update:
+            os.makedirs(golden_dir, exist_ok=True)
+            image.save(path)
+            results[case] = {"status": "updated"}
+            continue
+        if not os.path.exists(path):
+            results[case] = {"status": "missing"}
+            continue
+        max_diff, fraction = compare_images(Image.open(path), image, tolerance)
+        results[case] = {
+            "status": "ok" if fraction <= max_fraction else "mismatch",
+            "max_diff": max_diff,
+            "diff_fraction": round(fraction, 6),
+        }
+    return results
+
+# ======== Baselines ========
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results, path=BASELINE_PATH, thresholds=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    baseline = {"environment": results["environment"], "stages": results["stages"],
+                "thresholds": thresholds or {}}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def regressions(stages, baseline, threshold=THRESHOLD):
+    """{stage: {"baseline_ms", "current_ms", "change_pct", "limit_pct", "status"}}.
+
+    Stages are compared by their best run; a per-stage limit in the
+    baseline's "thresholds" overrides `threshold`.
+    """
+    report = {}
+    limits = baseline.get("thresholds", {})
+    for name, current in stages.items():
+        previous = baseline["stages"].get(name)
+        if previous is None:
+            report[name] = {"current_ms": current["min_ms"], "status": "new"}
+            continue
+        limit = limits.get(name, threshold)
+        change = (current["min_ms"] / previous["min_ms"] - 1) * 100 if previous["min_ms"] else 0.0
+        report[name] = {
+            "baseline_ms": previous["min_ms"],
+            "current_ms": current["min_ms"],
+            "change_pct": round(change, 1),
+            "limit_pct": limit,
+            "status": "regressed" if change > limit else "ok",
+        }
+    return report
+
+
+def run_benchmarks(stages=None, repeat=REPEAT, progress=None):
+    results = {"environment": environment(), "stages": {}}
+    for name in stages or STAGES:
+        results["stages"][name] = time_stage(name, repeat)
+        if progress:
+            progress(name, results["stages"][name])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the certificate pipeline stage by stage.")
+    parser.add_argument("-s", "--stage", action="append", choices=sorted(STAGES),
+                        help="stage to run (repeatable; default: all)")
+    parser.add_argument("-n", "--repeat", type=int, default=REPEAT)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fail when a stage's best run is this many percent slower than the baseline")
+    parser.add_argument("--update", action="store_true", help="store these timings and golden images as the baseline")
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR)
+    parser.add_argument("--no-golden", action="store_true", help="skip the golden-image comparison")
+    parser.add_argument("--pixel-tolerance", type=int, default=PIXEL_TOLERANCE)
+    parser.add_argument("--max-diff-fraction", type=float, default=MAX_DIFF_FRACTION)
+    parser.add_argument("-o", "--output", help="write the full results as JSON here")
+    args = parser.parse_args(argv)
+
+    def progress(name, timing):
+        print(f"  {name:<16} {timing['min_ms']:>10.2f} ms (median {timing['median_ms']:.2f})", file=sys.stderr)
+
+    results = run_benchmarks(args.stage, args.repeat, progress)
+    failed = False
+
+    if not args.no_golden:
+        results["golden"] = check_golden(args.golden_dir, tolerance=args.pixel_tolerance,
+                                         max_fraction=args.max_diff_fraction, update=args.update)
+        for case, result in results["golden"].items():
+            failed = failed or result["status"] in ("mismatch", "missing")
+            detail = f" (max diff {result['max_diff']}, {result['diff_fraction']:.4%} of pixels)" \
+                if "max_diff" in result else ""
+            print(f"  golden {case:<14} {result['status']}{detail}", file=sys.stderr)
+
+    baseline = load_baseline(args.baseline)
+    if args.update:
+        stages = dict(baseline["stages"]) if baseline else {}
+        stages.update(results["stages"])
+        save_baseline(dict(results, stages=stages), args.baseline, baseline and baseline.get("thresholds"))
+        print(f"💾 baseline written to {args.baseline}", file=sys.stderr)
+    elif baseline is None:
+        failed = True
+        print(f"❌ no baseline at {args.baseline}; run with --update to create one", file=sys.stderr)
+    else:
+        if baseline.get("environment") != results["environment"]:
+            print("⚠️ baseline was recorded in a different environment; timings may not be comparable",
+                  file=sys.stderr)
+        results["regressions"] = regressions(results["stages"], baseline, args.threshold)
+        for name, row in results["regressions"].items():
+            if row["status"] == "regressed":
+                failed = True
+                print(f"🐢 {name}: {row['baseline_ms']:.2f} → {row['current_ms']:.2f} ms "
+                      f"(+{row['change_pct']}%, limit {row['limit_pct']}%)", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print("❌ benchmark gate failed" if failed else "✅ benchmark gate passed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import functools
+import json
+import os
+import sys
+import tempfile
+
+from PIL import ImageFont
+
+from .layers import CACHE_DIR
+
+# ======== Font Index ========
+# پوشه‌های فونت سیستم یک بار پیمایش می‌شوند و نگاشت نام فایل / خانواده و سبک
+# به مسیر فونت روی دیسک ذخیره می‌شود؛ اجراهای بعدی فقط همین فایل را می‌خوانند.
+# پوشه جاری در ایندکس نیست (هر اجرا در آن فایل می‌نویسد و ایندکس را باطل می‌کرد)؛
+# فونت‌های کنار اسکریپت مستقیم با مسیرشان پیدا می‌شوند.
+INDEX_VERSION = 1
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+DEFAULT_FALLBACKS = (
+    "arial.ttf", "arialbd.ttf", "times.ttf", "timesbd.ttf",
+    "cour.ttf", "courbd.ttf", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"
+)
+
+
+def font_dirs():
+    home = os.path.expanduser("~")
+    dirs = [
+        "/usr/share/fonts", "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"), os.path.join(home, ".local", "share", "fonts"),
+        "/Library/Fonts", "/System/Library/Fonts", os.path.join(home, "Library", "Fonts"),
+        os.path.join(os.environ.get("WINDIR", "C:/Windows"), "Fonts"),
+    ]
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        dirs.append(os.path.join(os.environ["LOCALAPPDATA"], "Microsoft", "Windows", "Fonts"))
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def _signature(dirs):
+    # تغییر در هر پوشه یا زیرپوشه (افزودن/حذف فونت) ایندکس را باطل می‌کند؛ فقط stat، بدون باز کردن فونت
+    return [[current, os.stat(current).st_mtime_ns] for d in dirs for current, _, _ in os.walk(d)]
+
+
+def _family_key(text):
+    return " ".join(text.lower().replace("-", " ").replace("_", " ").split())
+
+
+def scan_fonts(dirs):
+    files, families = {}, {}
+    for root_dir in dirs:
+        for current, _, names in os.walk(root_dir):
+            for name in sorted(names):
+                if not name.lower().endswith(FONT_EXTENSIONS):
+                    continue
+                path = os.path.join(current, name)
+                files.setdefault(name.lower(), path)
+                try:
+                    family, style = ImageFont.truetype(path, 10).getname()
+                except OSError:
+                    continue
+                families.setdefault(_family_key(f"{family} {style}"), path)
+                if style.lower() in ("regular", "book", "roman"):
+                    families.setdefault(_family_key(family), path)
+    return {"files": files, "families": families}
+
+
+def _index_path():
+    return os.path.join(CACHE_DIR, "font_index.json") if CACHE_DIR else None
+
+
+def _save_index(path, index):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def font_index():
+    dirs = font_dirs()
+    signature = _signature(dirs)
+    path = _index_path()
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index.get("signature") == signature:
+                return index
+        except (OSError, ValueError):
+            pass
+
+    index = {"version": INDEX_VERSION, "signature": signature, **scan_fonts(dirs)}
+    if path:
+        _save_index(path, index)
+    return index
+
+
+def rebuild_index():
+    font_index.cache_clear()
+    load_font.cache_clear()
+    path = _index_path()
+    if path and os.path.exists(path):
+        os.remove(path)
+    return font_index()
+
+
+def resolve_font(name):
+    """Path for a font file name ("georgiab.ttf") or family/style ("Georgia Bold"), or None."""
+    if os.path.isfile(name):
+        return os.path.abspath(name)
+    index = font_index()
+    path = index["files"].get(os.path.basename(name).lower())
+    if path is None:
+        path = index["families"].get(_family_key(os.path.splitext(name)[0]))
+    return path
+
+# ======== Cached Font Objects ========
+@functools.lru_cache(maxsize=None)
+def load_font(name, size, fallbacks=DEFAULT_FALLBACKS):
+    """FreeTypeFont for (name, size), trying `fallbacks` in order; cached per process."""
+    for candidate in (name, *fallbacks):
+        path = resolve_font(candidate)
+        if path is None:
+            continue
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    # در نهایت از فونت پیش‌فرض Pillow استفاده می‌کنیم
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+
+# ======== Certificate ID Allocation ========
+# شماره‌ها به صورت بلوک از یک فایل SQLite اجاره می‌شوند؛ هر پروسه داخل بلوک خودش
+# بدون قفل شناسه می‌دهد و چون اجاره‌ها ذخیره می‌شوند، پس از راه‌اندازی مجدد
+# هیچ شناسه‌ای دوباره استفاده نمی‌شود (باقی‌مانده بلوک‌های نیمه‌کاره رها می‌شود).
+ID_DB_PATH = "certificate_ids.sqlite3"
+ID_PREFIX = "OPENAI-YSN-APR2023-CERT"
+FIRST_NUMBER = 10000
+BLOCK_SIZE = 1000
+LOCK_TIMEOUT = 30
+
+
+def lease_block(path, prefix, size):
+    """Reserve `size` consecutive numbers for `prefix`; returns range(start, end)."""
+    db = sqlite3.connect(path, timeout=LOCK_TIMEOUT, isolation_level=None)
+    try:
+        db.execute("CREATE TABLE IF NOT EXISTS id_blocks (prefix TEXT PRIMARY KEY, next INTEGER NOT NULL)")
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT next FROM id_blocks WHERE prefix = ?", (prefix,)).fetchone()
+            start = row[0] if row else FIRST_NUMBER
+            db.execute("INSERT OR REPLACE INTO id_blocks (prefix, next) VALUES (?, ?)",
+                       (prefix, start + size))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+    finally:
+        db.close()
+    return range(start, start + size)
+
+
+class IdAllocator:
+    """Hands out unique Certificate IDs from leased blocks.
+
+    Only leasing a new block touches the database. A forked child never
+    reuses its parent's block: the block is dropped when the PID changes.
+    """
+
+    def __init__(self, path=ID_DB_PATH, prefix=ID_PREFIX, block_size=BLOCK_SIZE):
+        self.path = path
+        self.prefix = prefix
+        self.block_size = block_size
+        self.block = iter(())
+        self.pid = None
+
+    def next_number(self):
+        if self.pid != os.getpid():
+            self.block, self.pid = iter(()), os.getpid()
+        number = next(self.block, None)
+        if number is None:
+            self.block = iter(lease_block(self.path, self.prefix, self.block_size))
+            number = next(self.block)
+        return number
+
+    def next_id(self):
+        return f"{self.prefix}{self.next_number():05d}"
+
+
+_allocators = {}
+
+
+def allocate_id(path=ID_DB_PATH, prefix=ID_PREFIX, block_size=BLOCK_SIZE):
+    """Next Certificate ID from this process's allocator for (path, prefix)."""
+    key = (os.path.abspath(path), prefix, block_size)
+    allocator = _allocators.get(key)
+    if allocator is None:
+        allocator = _allocators[key] = IdAllocator(path, prefix, block_size)
+    return allocator.next_id()
@@ -0,0 +1,253 @@
+import bisect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# ======== Stage Instrumentation ========
+# هر مرحله رسم داخل یک span زمان‌گیری می‌شود و نتیجه در هیستوگرام همان مرحله
+# جمع می‌شود. وقتی غیرفعال است span() همان شیء خالی مشترک را برمی‌گرداند، پس
+# هزینه‌اش یک فراخوانی تابع است و می‌شود آن را در batchهای واقعی روشن نگه داشت.
+# CERTGEN_INSTRUMENT=1 زمان و CERTGEN_INSTRUMENT=memory اوج حافظه را هم ثبت می‌کند.
+ENV_VAR = "CERTGEN_INSTRUMENT"
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MEMORY_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(11))  # 1 MiB … 1 GiB
+METRIC_PREFIX = "certgen_stage"
+
+_state = {"enabled": False, "memory": False}
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (bucket i counts values <= bounds[i])."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if other["bounds"] != list(self.bounds):
+            raise ValueError("histogram bucket bounds differ")
+        self.counts = [a + b for a, b in zip(self.counts, other["counts"])]
+        self.count += other["count"]
+        self.sum += other["sum"]
+        for attr, pick in (("min", min), ("max", max)):
+            if other[attr] is not None:
+                mine = getattr(self, attr)
+                setattr(self, attr, other[attr] if mine is None else pick(mine, other[attr]))
+
+    def to_dict(self):
+        return {"bounds": list(self.bounds), "counts": list(self.counts), "count": self.count,
+                "sum": self.sum, "min": self.min, "max": self.max}
+
+
+class Recorder:
+    """Per-stage duration (seconds) and, optionally, peak-memory (bytes) histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    def _histograms(self, stage):
+        histograms = self.stages.get(stage)
+        if histograms is None:
+            histograms = self.stages[stage] = {"seconds": Histogram(TIME_BUCKETS),
+                                               "peak_bytes": Histogram(MEMORY_BUCKETS)}
+        return histograms
+
+    def observe(self, stage, seconds, peak_bytes=None):
+        with self.lock:
+            histograms = self._histograms(stage)
+            histograms["seconds"].observe(seconds)
+            if peak_bytes is not None:
+                histograms["peak_bytes"].observe(peak_bytes)
+
+    def snapshot(self):
+        """JSON-serializable copy of every histogram (see merge())."""
+        with self.lock:
+            return {stage: {kind: h.to_dict() for kind, h in histograms.items()}
+                    for stage, histograms in self.stages.items()}
+
+    def merge(self, snapshot):
+        """Add a snapshot from another process (e.g. a batch worker) to this recorder."""
+        with self.lock:
+            for stage, histograms in snapshot.items():
+                for kind, data in histograms.items():
+                    self._histograms(stage)[kind].merge(data)
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+
+RECORDER = Recorder()
+
+# ======== Spans ========
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "base", "peak")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if _state["memory"]:
+            # tracemalloc فقط یک اوج سراسری دارد؛ اوج span بیرونی پیش از reset
+            # ذخیره و هنگام خروج span درونی به آن برگردانده می‌شود
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base, self.peak = current, current
+            stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = None
+        if _state["memory"]:
+            stack = _local.stack
+            stack.pop()
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            peak_bytes = self.peak - self.base
+        RECORDER.observe(self.name, seconds, peak_bytes)
+        return False
+
+
+def span(name):
+    """Context manager timing the stage `name`; a shared no-op when instrumentation is off."""
+    if not _state["enabled"]:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def enable(memory=False):
+    """Start recording spans; `memory` also tracks each span's tracemalloc peak.
+
+    tracemalloc's peak is process-wide, so a span overlapping one on another
+    thread (the background writer's "encode") also counts that thread's
+    allocations.
+    """
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _state.update(enabled=True, memory=memory)
+
+
+def disable():
+    _state.update(enabled=False, memory=False)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def enabled():
+    return _state["enabled"]
+
+
+def mode():
+    """None when disabled, else "time" or "memory" (the value enable_mode() accepts)."""
+    if not _state["enabled"]:
+        return None
+    return "memory" if _state["memory"] else "time"
+
+
+def enable_mode(value):
+    """Enable or disable according to a mode() value (used to configure worker processes)."""
+    if value:
+        enable(memory=value == "memory")
+    else:
+        disable()
+
+
+def configure_from_env(value=None):
+    """Enable instrumentation from CERTGEN_INSTRUMENT ("1"/"time" or "memory")."""
+    value = (os.environ.get(ENV_VAR, "") if value is None else value).strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return False
+    enable(memory=value == "memory")
+    return True
+
+# ======== Export ========
+def to_json(snapshot=None, indent=2):
+    return json.dumps(RECORDER.snapshot() if snapshot is None else snapshot, indent=indent, sort_keys=True)
+
+
+def _le(bound):
+    return "+Inf" if bound is None else repr(float(bound))
+
+
+def to_prometheus(snapshot=None, prefix=METRIC_PREFIX):
+    """Prometheus text exposition format (one histogram family per measurement)."""
+    snapshot = RECORDER.snapshot() if snapshot is None else snapshot
+    families = (("seconds", f"{prefix}_duration_seconds", "Certificate rendering stage duration."),
+                ("peak_bytes", f"{prefix}_peak_memory_bytes", "Peak traced memory allocated within a stage."))
+    lines = []
+    for kind, metric, help_text in families:
+        rows = [(stage, histograms[kind]) for stage, histograms in sorted(snapshot.items())
+                if histograms[kind]["count"]]
+        if not rows:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for stage, data in rows:
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(data["bounds"] + [None], data["counts"]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{stage="{label}",le="{_le(bound)}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {data["sum"]!r}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {data["count"]}')
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_metrics(path, snapshot=None):
+    """Write metrics to `path`: Prometheus text for .prom/.txt, JSON otherwise."""
+    prometheus = path.lower().endswith((".prom", ".txt"))
+    text = to_prometheus(snapshot) if prometheus else to_json(snapshot)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def summary(snapshot=None):
+    """[(stage, count, mean ms, max ms, max peak MiB or None)] sorted by total time."""
+    snapshot = RECORDER.snapshot() if snapshot is None else snapshot
+    rows = []
+    for stage, histograms in snapshot.items():
+        seconds, memory = histograms["seconds"], histograms["peak_bytes"]
+        if not seconds["count"]:
+            continue
+        rows.append((stage, seconds["count"], seconds["sum"] / seconds["count"] * 1000,
+                     seconds["max"] * 1000, memory["max"] / 2 ** 20 if memory["count"] else None,
+                     seconds["sum"]))
+    return [row[:5] for row in sorted(rows, key=lambda row: -row[5])]
+
+
+configure_from_env()
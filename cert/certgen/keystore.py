@@ -0,0 +1,152 @@
+import collections
+import hashlib
+import os
+import tempfile
+import time
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives import serialization
+
+# ======== Key Store ========
+# کلید امضا یک بار ساخته و ذخیره می‌شود و در اجراهای بعدی فقط بارگذاری می‌شود؛
+# شیء کلید در طول عمر پروسه در حافظه می‌ماند.
+PRIVATE_KEY_PATH = "certificate_private_key.pem"
+PUBLIC_KEY_PATH = "certificate_public_key.pem"
+ED25519_PRIVATE_KEY_PATH = "certificate_ed25519_key.pem"
+ED25519_PUBLIC_KEY_PATH = "certificate_ed25519_public_key.pem"
+PASSWORD_ENV = "CERTGEN_KEY_PASSWORD"
+DEFAULT_KEY_SIZE = 4096
+LOCK_TIMEOUT = 120
+
+KeyPair = collections.namedtuple("KeyPair", "private_key public_key key_id")
+
+_resident = {}
+
+
+def key_id(public_key):
+    """Short fingerprint of a public key: SHA-256 over its DER SubjectPublicKeyInfo."""
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def default_key_paths(algorithm="rsa"):
+    if algorithm == "ed25519":
+        return ED25519_PRIVATE_KEY_PATH, ED25519_PUBLIC_KEY_PATH
+    if algorithm == "rsa":
+        return PRIVATE_KEY_PATH, PUBLIC_KEY_PATH
+    raise ValueError(f"unknown key algorithm: {algorithm}")
+
+
+def _password(password):
+    if password is None:
+        password = os.environ.get(PASSWORD_ENV) or None
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return password
+
+
+def _write_atomic(path, data, mode=0o644):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _generate(private_key_path, public_key_path, password, key_size, algorithm):
+    if algorithm == "ed25519":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    if password:
+        encryption = serialization.BestAvailableEncryption(password)
+    else:
+        encryption = serialization.NoEncryption()
+    _write_atomic(private_key_path, private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=encryption
+    ), mode=0o600)
+    _write_atomic(public_key_path, private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+
+
+def _generate_once(private_key_path, public_key_path, password, key_size, algorithm):
+    # چند پروسه ممکن است هم‌زمان شروع کنند؛ فقط صاحب فایل قفل کلید می‌سازد
+    lock_path = private_key_path + ".lock"
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while not os.path.exists(private_key_path):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"key generation lock held too long: {lock_path}")
+            time.sleep(0.1)
+        return
+    try:
+        os.close(fd)
+        if not os.path.exists(private_key_path):
+            _generate(private_key_path, public_key_path, password, key_size, algorithm)
+    finally:
+        os.remove(lock_path)
+
+
+def load_or_generate(private_key_path=None, public_key_path=None, password=None,
+                     key_size=DEFAULT_KEY_SIZE, algorithm="rsa"):
+    """Return the KeyPair stored at `private_key_path`, creating it on first use.
+
+    The private key is PKCS#8 PEM, encrypted when a password is given (or set
+    in CERTGEN_KEY_PASSWORD). `algorithm` ("rsa" or "ed25519") only matters
+    when the key has to be generated and picks the default paths.
+    Loaded keys stay resident for the process.
+    """
+    default_private, default_public = default_key_paths(algorithm)
+    private_key_path = private_key_path or default_private
+    public_key_path = public_key_path or default_public
+    private_key_path = os.path.abspath(private_key_path)
+    keys = _resident.get(private_key_path)
+    if keys is not None:
+        return keys
+
+    password = _password(password)
+    if not os.path.exists(private_key_path):
+        _generate_once(private_key_path, public_key_path, password, key_size, algorithm)
+
+    with open(private_key_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=password)
+    public_key = private_key.public_key()
+
+    # کلید عمومی کنار کلید خصوصی باید همیشه با آن جفت باشد تا verifier درست کار کند
+    signer_id = key_id(public_key)
+    if public_key_path and signer_id not in load_public_keys([public_key_path]):
+        _write_atomic(public_key_path, public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ))
+
+    keys = _resident[private_key_path] = KeyPair(private_key, public_key, signer_id)
+    return keys
+
+
+def load_public_keys(paths):
+    """Map key ID -> public key for every readable PEM in `paths`."""
+    keyring = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                public_key = serialization.load_pem_public_key(f.read())
+        except (OSError, ValueError):
+            continue
+        keyring[key_id(public_key)] = public_key
+    return keyring
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+from PIL import Image
+
+# ======== Static Layer Cache ========
+# لایه‌هایی که به دریافت‌کننده گواهی وابسته نیستند (پس‌زمینه، قاب، عنوان، مهر)
+# یک بار برای هر هش تنظیمات ساخته می‌شوند و در حافظه و دیسک نگه داشته می‌شوند.
+LAYER_VERSION = 1
+CACHE_DIR = os.environ.get(
+    "CERTGEN_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "certgen")
+)
+
+_HEADER = struct.Struct("<4sII")
+_MAGIC = b"RGBA"
+
+_memory_cache = {}
+
+
+def config_hash(*parts):
+    blob = json.dumps([LAYER_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def file_stamp(path):
+    """Identify a file input to a layer (e.g. a logo) by size and mtime."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+
+
+def _layer_path(cache_dir, key):
+    return os.path.join(cache_dir, "layers", f"{key}.rgba")
+
+
+def _load_layer(path):
+    try:
+        with open(path, "rb") as f:
+            magic, width, height = _HEADER.unpack(f.read(_HEADER.size))
+            data = f.read()
+    except (OSError, struct.error):
+        return None
+    if magic != _MAGIC or len(data) != width * height * 4:
+        return None
+    return Image.frombytes("RGBA", (width, height), data)
+
+
+def _store_layer(path, layer):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # نوشتن اتمیک تا پروسه‌های موازی فایل نیمه‌کاره نخوانند
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, layer.width, layer.height))
+            f.write(layer.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_layer(name, key_parts, build, cache_dir=None):
+    """Return the RGBA layer `name` for `key_parts`, building it at most once.
+
+    The returned image is shared between callers; copy it before drawing on it.
+    An empty `cache_dir` (or CERTGEN_CACHE_DIR="") keeps the cache in memory only.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    key = f"{name}-{config_hash(name, *key_parts)}"
+
+    layer = _memory_cache.get(key)
+    if layer is not None:
+        return layer
+
+    path = _layer_path(cache_dir, key) if cache_dir else None
+    layer = _load_layer(path) if path else None
+    if layer is None:
+        layer = build().convert("RGBA")
+        if path:
+            _store_layer(path, layer)
+
+    _memory_cache[key] = layer
+    return layer
+
+
+def clear_memory_cache():
+    _memory_cache.clear()
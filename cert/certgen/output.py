@@ -0,0 +1,133 @@
+import argparse
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .instrument import span
+from .pngmeta import pnginfo
+
+# ======== Output Encoding ========
+# رمزگذاری فایل خروجی در یک thread پس‌زمینه انجام می‌شود تا رسم گواهی بعدی با
+# ذخیره گواهی قبلی هم‌پوشانی داشته باشد (zlib/libwebp/libjpeg قفل GIL را آزاد می‌کنند).
+# فقط PNG چانک امضا را نگه می‌دارد؛ JPEG نویز و پیام مخفی را هم از بین می‌برد.
+OUTPUT_MODES = {
+    "png": {"format": "PNG", "compress_level": 6},
+    "png-fast": {"format": "PNG", "compress_level": 1},
+    "png-small": {"format": "PNG", "compress_level": 9, "optimize": True},
+    "webp": {"format": "WEBP", "lossless": True, "quality": 0, "method": 0},
+    "webp-small": {"format": "WEBP", "lossless": True, "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 95, "subsampling": 0, "optimize": True},
+}
+DEFAULT_MODE = "png"
+DPI = (300, 300)
+# PDF برداری از روی قالب ساخته می‌شود (certgen.pdf)، نه با encode()
+PDF_MODE = "pdf"
+
+_EXTENSIONS = {"PNG": ".png", "WEBP": ".webp", "JPEG": ".jpg"}
+
+
+def extension(mode=DEFAULT_MODE):
+    if mode == PDF_MODE:
+        return ".pdf"
+    return _EXTENSIONS[OUTPUT_MODES[mode]["format"]]
+
+
+def encode(image, target, mode=DEFAULT_MODE):
+    """Write `image` to `target` (path or binary file) using one of OUTPUT_MODES."""
+    options = dict(OUTPUT_MODES[mode])
+    fmt = options.pop("format")
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    if fmt == "PNG":
+        options["pnginfo"] = pnginfo(image)
+    with span("encode"):
+        image.save(target, fmt, dpi=DPI, **options)
+
+
+class BackgroundWriter:
+    """Encodes images on a small thread pool.
+
+    At most `max_pending` images are held in memory: submit() blocks until a
+    slot frees up. Each future resolves to the encode time in seconds.
+    """
+
+    def __init__(self, mode=DEFAULT_MODE, threads=1, max_pending=2):
+        self.mode = mode
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="certgen-writer")
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def _write(self, image, path):
+        start = time.perf_counter()
+        try:
+            encode(image, path, self.mode)
+        finally:
+            self.slots.release()
+        return time.perf_counter() - start
+
+    def submit(self, image, path):
+        self.slots.acquire()
+        try:
+            return self.pool.submit(self._write, image, path)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ======== Benchmark ========
+def benchmark(image, modes=None, repeat=3):
+    """[(mode, bytes, best milliseconds)] for encoding `image` in memory."""
+    rows = []
+    for mode in modes or OUTPUT_MODES:
+        best, size = None, 0
+        for _ in range(repeat):
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            encode(image, buffer, mode)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            size = buffer.tell()
+        rows.append((mode, size, best * 1000))
+    return rows
+
+
+def _sample_certificate():
+    # کلید و شناسه ثابت و در حافظه؛ benchmark نباید کلید یا پایگاه شناسه روی دیسک بسازد
+    from .bench import golden_cert_info, golden_key
+    from .render import render_certificate
+
+    return render_certificate(golden_cert_info(), golden_key())[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare output encoder modes (size vs. time).")
+    parser.add_argument("image", nargs="?", help="image to encode (default: render a sample certificate)")
+    parser.add_argument("-m", "--mode", action="append", choices=sorted(OUTPUT_MODES))
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.image:
+        image = Image.open(args.image)
+        image.load()
+    else:
+        image = _sample_certificate()
+
+    print(f"{'mode':<12} {'bytes':>10} {'ms':>9}")
+    for mode, size, ms in benchmark(image, args.mode, args.repeat):
+        print(f"{mode:<12} {size:>10} {ms:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,658 @@
+import argparse
+import datetime
+import io
+import math
+import re
+import struct
+import sys
+import time
+import zlib
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from .effects import hologram_columns, paper_texture
+from .instrument import span
+from .output import encode, PDF_MODE
+from .pngmeta import METADATA_KEY
+from .render import certificate_filename, make_qr, render_certificate, seal_logo, seal_shapes
+from .signing import ED25519
+from .template import anchor_position, load_template, DEFAULT_TEMPLATE
+from .watermark import get_atlas, watermark_placements
+
+# ======== Vector PDF Output ========
+# همان فهرست رسم قالب به جای پیکسل به دستورهای برداری PDF ترجمه می‌شود: متن با
+# فونت جاسازی‌شده، قاب، مهر، ماژول‌های QR و واترمارک‌ها برداری‌اند و فقط بافت
+# کاغذ به صورت یک تصویر کوچک جاسازی می‌شود. نویز ضدجعل و فیلتر نهایی فقط در
+# خروجی raster وجود دارند. فونت‌ها به صورت Type0/Identity-H جاسازی می‌شوند تا هر
+# نویسه‌ای که فونت دارد (فارسی، CJK، ...) با شناسه glyph خودش نوشته شود؛ نویسه‌ای
+# که فونت ندارد ValueError می‌دهد و هرگز بی‌صدا با "?" جایگزین نمی‌شود.
+PAGE_SIZES = {
+    "a4": (841.89, 595.28),
+    "letter": (792, 612),
+}
+DEFAULT_PAGE = "a4"
+PRINT_DPI = 300
+CMAP_ENTRIES = 100  # حداکثر ورودی هر بلوک bfchar
+_BEZIER = 0.5522847498
+_MEASURE = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def _n(value):
+    text = f"{value:.3f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+def _pdf_string(text):
+    try:
+        data = text.encode("cp1252")
+    except UnicodeEncodeError as exc:
+        raise ValueError(f"{text!r} cannot be written with the standard PDF font "
+                         f"(no WinAnsi code for {exc.object[exc.start]!r}); use a TrueType font") from None
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+
+
+def _pdf_text_string(text):
+    return b"<" + ("\ufeff" + text).encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _rgba(color):
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    color = tuple(color)
+    return color[:3], color[3] if len(color) > 3 else 255
+
+
+class PdfDocument:
+    """Minimal PDF writer: numbered objects, Flate streams and one xref table."""
+
+    def __init__(self):
+        self.objects = [None]
+
+    def reserve(self):
+        self.objects.append(None)
+        return len(self.objects) - 1
+
+    def add(self, body, number=None):
+        if isinstance(body, str):
+            body = body.encode("latin-1")
+        if number is None:
+            number = self.reserve()
+        self.objects[number] = body
+        return number
+
+    def stream(self, data, entries="", compress=True):
+        """Add a Flate stream object; pass compress=False for data that is already deflated."""
+        if compress:
+            data = zlib.compress(data, 6)
+        entries += " /Filter /FlateDecode"
+        return self.add(f"<< /Length {len(data)}{entries} >>\nstream\n".encode("latin-1") + data + b"\nendstream")
+
+    def tobytes(self, root, info=None):
+        out = io.BytesIO()
+        out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self.objects[1:], 1):
+            offsets.append(out.tell())
+            out.write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(f"xref\n0 {len(self.objects)}\n0000000000 65535 f \n".encode("ascii"))
+        for offset in offsets:
+            out.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+        trailer = f"trailer\n<< /Size {len(self.objects)} /Root {root} 0 R"
+        if info:
+            trailer += f" /Info {info} 0 R"
+        out.write(f"{trailer} >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+        return out.getvalue()
+
+
+# فایل فونت‌ها و تصاویر ثابت (بافت) فقط یک بار در هر پروسه فشرده می‌شوند
+_font_programs = {}
+_image_streams = {}
+
+
+def font_file_key(font):
+    """The font file behind a PIL font (path or in-memory bytes), or None."""
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return path
+    return getattr(font, "font_bytes", None)
+
+
+def _sfnt_tables(data):
+    count = struct.unpack_from(">H", data, 4)[0]
+    tables = {}
+    for i in range(count):
+        tag, _, offset, _ = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+        tables[tag] = offset
+    return tables
+
+
+def _cmap(data, offset):
+    """{code point: glyph ID} from the font's Unicode cmap subtable (format 4 or 12)."""
+    subtables = {}
+    for i in range(struct.unpack_from(">H", data, offset + 2)[0]):
+        platform, encoding, sub = struct.unpack_from(">HHI", data, offset + 4 + 8 * i)
+        subtables[(platform, encoding)] = offset + sub
+    for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+        start = subtables.get(key)
+        if start is None:
+            continue
+        fmt = struct.unpack_from(">H", data, start)[0]
+        if fmt == 12:
+            cmap = {}
+            for i in range(struct.unpack_from(">I", data, start + 12)[0]):
+                first, last, glyph = struct.unpack_from(">III", data, start + 16 + 12 * i)
+                cmap.update(zip(range(first, last + 1), range(glyph, glyph + last - first + 1)))
+            return cmap
+        if fmt == 4:
+            segments = struct.unpack_from(">H", data, start + 6)[0] // 2
+            ends = struct.unpack_from(f">{segments}H", data, start + 14)
+            starts = struct.unpack_from(f">{segments}H", data, start + 16 + 2 * segments)
+            deltas = struct.unpack_from(f">{segments}h", data, start + 16 + 4 * segments)
+            range_base = start + 16 + 6 * segments
+            range_offsets = struct.unpack_from(f">{segments}H", data, range_base)
+            cmap = {}
+            for i, (first, last, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+                for code in range(first, min(last, 0xFFFE) + 1):
+                    if range_offset:
+                        glyph = struct.unpack_from(">H", data, range_base + 2 * i + range_offset
+                                                   + 2 * (code - first))[0]
+                        glyph = (glyph + delta) & 0xFFFF if glyph else 0
+                    else:
+                        glyph = (code + delta) & 0xFFFF
+                    if glyph:
+                        cmap[code] = glyph
+            return cmap
+    raise ValueError("font has no Unicode cmap subtable")
+
+
+def _advances(data, tables):
+    """Advance width of every glyph in 1/1000 em (from hmtx)."""
+    units = struct.unpack_from(">H", data, tables[b"head"] + 18)[0]
+    metrics = struct.unpack_from(">H", data, tables[b"hhea"] + 34)[0]
+    glyphs = struct.unpack_from(">H", data, tables[b"maxp"] + 4)[0]
+    advances = struct.unpack_from(f">{2 * metrics}H", data, tables[b"hmtx"])[::2]
+    advances += advances[-1:] * (glyphs - metrics)
+    return [round(advance * 1000 / units) for advance in advances]
+
+
+def _to_unicode(cmap):
+    # هر glyph به کوچک‌ترین نقطه کدی که به آن می‌رسد نگاشت می‌شود (برای کپی و جستجوی متن)
+    unicode = {}
+    for code, glyph in sorted(cmap.items(), reverse=True):
+        unicode[glyph] = code
+    entries = [f"<{glyph:04X}> <{chr(code).encode('utf-16-be').hex().upper()}>"
+               for glyph, code in sorted(unicode.items())]
+    lines = ["/CIDInit /ProcSet findresource begin", "12 dict begin", "begincmap",
+             "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+             "/CMapName /Adobe-Identity-UCS def", "/CMapType 2 def",
+             "1 begincodespacerange", "<0000> <FFFF>", "endcodespacerange"]
+    for i in range(0, len(entries), CMAP_ENTRIES):
+        block = entries[i:i + CMAP_ENTRIES]
+        lines += [f"{len(block)} beginbfchar", *block, "endbfchar"]
+    lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+    return "\n".join(lines).encode("ascii")
+
+
+def _widths(advances, glyphs):
+    # آرایه /W فشرده: برای هر دنباله شناسه پیوسته یک «شروع [عرض‌ها]»
+    runs, previous = [], None
+    for glyph in sorted(glyphs):
+        if previous is None or glyph != previous + 1:
+            runs.append((glyph, []))
+        runs[-1][1].append(str(advances[glyph]))
+        previous = glyph
+    return " ".join(f"{start} [{' '.join(widths)}]" for start, widths in runs)
+
+
+def _font_program(key):
+    program = _font_programs.get(key)
+    if program is not None:
+        return program
+    if isinstance(key, str):
+        with open(key, "rb") as f:
+            data = f.read()
+    else:
+        data = key
+
+    metrics = ImageFont.truetype(io.BytesIO(data), 1000)
+    tables = _sfnt_tables(data)
+    cmap = _cmap(data, tables[b"cmap"])
+    family, style = metrics.getname()
+    ascent, descent = metrics.getmetrics()
+    program = _font_programs[key] = {
+        "name": re.sub(r"[^A-Za-z0-9-]", "", f"{family}-{style}") or "Font",
+        "cmap": cmap,
+        "widths": _widths(_advances(data, tables), set(cmap.values())),
+        "to_unicode": zlib.compress(_to_unicode(cmap), 6),
+        "ascent": ascent,
+        "descent": descent,
+        "italic": any(word in (style or "").lower() for word in ("italic", "oblique")),
+        "cff": data[:4] == b"OTTO",
+        "length": len(data),
+        "data": zlib.compress(data, 6),
+    }
+    return program
+
+
+def _glyph_string(text, cmap):
+    glyphs = []
+    for char in text:
+        glyph = cmap.get(ord(char))
+        if not glyph:
+            raise ValueError(f"{text!r} cannot be written: the font has no glyph for {char!r} (U+{ord(char):04X})")
+        glyphs.append(f"{glyph:04X}")
+    return ("<" + "".join(glyphs) + ">").encode("ascii")
+
+
+def embed_font(doc, font):
+    """Add `font` to `doc`; returns (object number, function encoding text as a string operand).
+
+    The font file PIL rendered with is embedded as a Type0 font (Identity-H,
+    2-byte glyph IDs) with widths from its hmtx table and a ToUnicode map,
+    so any character the font has is written and stays searchable. Fonts
+    without a file (or font collections) fall back to the standard
+    Helvetica, which only covers WinAnsi. Characters that cannot be written
+    raise ValueError.
+    """
+    key = font_file_key(font)
+    if not key or (isinstance(key, str) and key.lower().endswith(".ttc")) or key[:4] == b"ttcf":
+        number = doc.add("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        return number, _pdf_string
+
+    program = _font_program(key)
+    if program["cff"]:
+        subtype, file_key, gid_map = "CIDFontType0", "FontFile3", ""
+        font_file = doc.stream(program["data"], " /Subtype /OpenType", compress=False)
+    else:
+        subtype, file_key, gid_map = "CIDFontType2", "FontFile2", " /CIDToGIDMap /Identity"
+        font_file = doc.stream(program["data"], f" /Length1 {program['length']}", compress=False)
+    name, ascent, descent, italic = program["name"], program["ascent"], program["descent"], program["italic"]
+    descriptor = doc.add(
+        f"<< /Type /FontDescriptor /FontName /{name} /Flags {32 + (64 if italic else 0)} "
+        f"/FontBBox [-500 {-descent} 1500 {ascent}] /ItalicAngle {-12 if italic else 0} "
+        f"/Ascent {ascent} /Descent {-descent} /CapHeight {ascent} /StemV 80 /{file_key} {font_file} 0 R >>")
+    descendant = doc.add(
+        f"<< /Type /Font /Subtype /{subtype} /BaseFont /{name} "
+        f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+        f"/FontDescriptor {descriptor} 0 R /W [{program['widths']}]{gid_map} >>")
+    to_unicode = doc.stream(program["to_unicode"], compress=False)
+    number = doc.add(
+        f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+        f"/DescendantFonts [{descendant} 0 R] /ToUnicode {to_unicode} 0 R >>")
+    cmap = program["cmap"]
+    return number, lambda text: _glyph_string(text, cmap)
+
+
+def _image_stream(image, key=None):
+    streams = _image_streams.get(key) if key is not None else None
+    if streams is None:
+        image = image() if callable(image) else image
+        image = image.convert("RGBA") if image.mode not in ("RGB", "RGBA") else image
+        alpha = zlib.compress(image.getchannel("A").tobytes(), 6) if image.mode == "RGBA" else None
+        streams = (image.size, zlib.compress(image.convert("RGB").tobytes(), 6), alpha)
+        if key is not None:
+            _image_streams[key] = streams
+    return streams
+
+
+def embed_image(doc, image, key=None):
+    """Add an RGB(A) image XObject (alpha as a soft mask); returns (object number, size).
+
+    `image` may be a callable; with `key` it is only called (and compressed)
+    the first time that key is seen in this process.
+    """
+    (width, height), rgb, alpha = _image_stream(image, key)
+    entries = f" /Type /XObject /Subtype /Image /Width {width} /Height {height} /BitsPerComponent 8"
+    smask = ""
+    if alpha is not None:
+        smask = f" /SMask {doc.stream(alpha, entries + ' /ColorSpace /DeviceGray', compress=False)} 0 R"
+    return doc.stream(rgb, entries + " /ColorSpace /DeviceRGB" + smask, compress=False), (width, height)
+
+
+class PdfCanvas:
+    """One PDF page drawn in template pixel coordinates (origin top-left, y down)."""
+
+    def __init__(self, doc, size, page_size):
+        self.doc = doc
+        self.width, self.height = size
+        self.page_size = page_size
+        self.ops = []
+        self.fonts = {}
+        self.states = {}
+        self.images = {}
+        scale = min(page_size[0] / self.width, page_size[1] / self.height)
+        offset_x = (page_size[0] - self.width * scale) / 2
+        offset_y = (page_size[1] - self.height * scale) / 2
+        self.ops.append(f"{_n(scale)} 0 0 {_n(scale)} {_n(offset_x)} {_n(offset_y)} cm")
+
+    def _y(self, y):
+        return self.height - y
+
+    def _paint(self, color, operator, path, setup=""):
+        rgb, alpha = _rgba(color)
+        if alpha == 0:
+            return
+        values = " ".join(_n(c / 255) for c in rgb)
+        state = ""
+        if alpha < 255:
+            name = self.states.setdefault(alpha, f"GS{alpha}")
+            state = f"/{name} gs "
+        setter = "rg" if operator == "f" else "RG"
+        self.ops.append(f"q {state}{values} {setter} {setup}{path} {operator} Q")
+
+    def rect(self, x, y, w, h, color):
+        self._paint(color, "f", f"{_n(x)} {_n(self._y(y + h))} {_n(w)} {_n(h)} re")
+
+    def rectangle(self, box, outline=None, fill=None, width=1):
+        # مثل ImageDraw: مختصات شامل هر دو سر و خط دور به سمت داخل
+        x0, y0, x1, y1 = box
+        if fill is not None:
+            self.rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1, fill)
+        if outline is not None and width:
+            half = width / 2
+            path = f"{_n(x0 + half)} {_n(self._y(y1 + 1 - half))} {_n(x1 - x0 + 1 - width)} {_n(y1 - y0 + 1 - width)} re"
+            self._paint(outline, "S", path, f"{_n(width)} w ")
+
+    def line(self, points, color, width=1):
+        path = " ".join(f"{_n(x + 0.5)} {_n(self._y(y + 0.5))} {'m' if i == 0 else 'l'}"
+                        for i, (x, y) in enumerate(points))
+        self._paint(color, "S", path, f"{_n(width)} w 0 J ")
+
+    def _ellipse_path(self, cx, cy, rx, ry):
+        cy = self._y(cy)
+        kx, ky = rx * _BEZIER, ry * _BEZIER
+        return (f"{_n(cx + rx)} {_n(cy)} m "
+                f"{_n(cx + rx)} {_n(cy + ky)} {_n(cx + kx)} {_n(cy + ry)} {_n(cx)} {_n(cy + ry)} c "
+                f"{_n(cx - kx)} {_n(cy + ry)} {_n(cx - rx)} {_n(cy + ky)} {_n(cx - rx)} {_n(cy)} c "
+                f"{_n(cx - rx)} {_n(cy - ky)} {_n(cx - kx)} {_n(cy - ry)} {_n(cx)} {_n(cy - ry)} c "
+                f"{_n(cx + kx)} {_n(cy - ry)} {_n(cx + rx)} {_n(cy - ky)} {_n(cx + rx)} {_n(cy)} c h")
+
+    def ellipse(self, box, outline, width=1):
+        (x0, y0), (x1, y1) = box
+        rx, ry = (x1 - x0 + 1 - width) / 2, (y1 - y0 + 1 - width) / 2
+        if rx > 0 and ry > 0:
+            path = self._ellipse_path((x0 + x1 + 1) / 2, (y0 + y1 + 1) / 2, rx, ry)
+            self._paint(outline, "S", path, f"{_n(width)} w ")
+
+    def polygon(self, points, fill):
+        path = " ".join(f"{_n(x)} {_n(self._y(y))} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(points))
+        self._paint(fill, "f", path + " h")
+
+    def _font(self, font):
+        # هر فایل فونت یک بار جاسازی می‌شود؛ اندازه با Tf تعیین می‌شود
+        key = font_file_key(font) or id(font)
+        entry = self.fonts.get(key)
+        if entry is None:
+            entry = self.fonts[key] = (f"F{len(self.fonts) + 1}", *embed_font(self.doc, font))
+        return entry
+
+    def text(self, xy, text, font, fill, angle=0, origin=None):
+        """Text whose ascender line starts at `xy` (ImageDraw's default anchor).
+
+        With `angle`, the text is rotated counter-clockwise about `origin`.
+        """
+        if not text:
+            return
+        size = getattr(font, "size", 10)
+        ascent = font.getmetrics()[0]
+        x, y = xy[0], self._y(xy[1] + ascent)
+        cos, sin = 1.0, 0.0
+        if angle:
+            ox, oy = origin[0], self._y(origin[1])
+            cos, sin = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+            dx, dy = x - ox, y - oy
+            x, y = ox + dx * cos - dy * sin, oy + dx * sin + dy * cos
+        rgb, alpha = _rgba(fill)
+        state = f"/{self.states.setdefault(alpha, f'GS{alpha}')} gs " if alpha < 255 else ""
+        name, _, encode = self._font(font)
+        self.ops.append(
+            f"q {state}BT /{name} {size} Tf {' '.join(_n(c / 255) for c in rgb)} rg "
+            f"{_n(cos)} {_n(sin)} {_n(-sin)} {_n(cos)} {_n(x)} {_n(y)} Tm "
+            f"{encode(text).decode('latin-1')} Tj ET Q")
+
+    def image(self, image, x, y, key=None):
+        """Draw `image` (or a callable returning it, see embed_image) with its top-left at (x, y)."""
+        entry = self.images.get(key or id(image))
+        if entry is None:
+            number, size = embed_image(self.doc, image, key)
+            entry = self.images[key or id(image)] = (f"Im{len(self.images) + 1}", number, size)
+        name, _, (width, height) = entry
+        self.ops.append(f"q {width} 0 0 {height} {_n(x)} {_n(self._y(y + height))} cm /{name} Do Q")
+
+    def resources(self):
+        fonts = " ".join(f"/{name} {number} 0 R" for name, number, _ in self.fonts.values())
+        states = " ".join(f"/GS{alpha} << /ca {_n(alpha / 255)} /CA {_n(alpha / 255)} >>" for alpha in self.states)
+        images = " ".join(f"/{name} {number} 0 R" for name, number, _ in self.images.values())
+        return f"<< /Font << {fonts} >> /ExtGState << {states} >> /XObject << {images} >> >>"
+
+    def finish(self, pages):
+        """Write the content stream and page object; returns the page object number."""
+        content = self.doc.stream("\n".join(self.ops).encode("latin-1"))
+        return self.doc.add(
+            f"<< /Type /Page /Parent {pages} 0 R /MediaBox [0 0 {_n(self.page_size[0])} {_n(self.page_size[1])}] "
+            f"/Resources {self.resources()} /Contents {content} 0 R >>")
+
+# ======== Template Operations ========
+def _text(canvas, context, xy, text, font, fill):
+    canvas.text(xy, text, font, fill)
+
+
+def _aligned(canvas, context, at, align, text, font, fill):
+    text = text.format_map(context)
+    x = at[0]
+    if align:
+        x -= _MEASURE.textbbox((0, 0), text, font=font)[2] * align
+    canvas.text((x, at[1]), text, font, fill)
+
+
+def _field(canvas, context, xy, key, font, fill):
+    canvas.text(xy, context[key], font, fill)
+
+
+def _chunk(canvas, context, xy, text, index, width, font, fill):
+    canvas.text(xy, text.format_map(context)[index * width:(index + 1) * width], font, fill)
+
+
+def _line(canvas, context, points, fill, width):
+    canvas.line(points, fill, width)
+
+
+def _rect(canvas, context, box, outline, fill, width):
+    canvas.rectangle(box, outline, fill, width)
+
+
+def _seal(canvas, context, at, anchor, diameter, font, logo_path):
+    x, y = anchor_position(at, anchor, (diameter, diameter))
+    shapes = seal_shapes(diameter, font)
+    for i, (kind, *args) in enumerate(shapes):
+        if kind in ("ellipse", "arc"):
+            (x0, y0), (x1, y1) = args[0]
+            width = args[2]
+            following = shapes[i + 1] if i + 1 < len(shapes) else None
+            if following and following[0] == kind:
+                # ImageDraw روی لایه RGBA رنگ را جایگزین می‌کند، نه ترکیب؛ از هر حلقه فقط
+                # نواری که حلقه بعدی رویش نمی‌نشیند دیده می‌شود
+                width = min(width, max(1, following[1][0][0] - x0))
+            canvas.ellipse([(x + x0, y + y0), (x + x1, y + y1)], args[1], width)
+        elif kind == "line":
+            canvas.line([(x + px, y + py) for px, py in args[0]], args[1], args[2])
+        else:
+            (tx, ty), char, font, fill = args
+            canvas.text((x + tx, y + ty), char, font, fill)
+
+    logo = seal_logo(diameter, logo_path)
+    center = diameter // 2
+    if logo is not None:
+        glow, glow_pos, logo, logo_pos = logo
+        canvas.image(glow, x + glow_pos[0], y + glow_pos[1])
+        canvas.image(logo, x + logo_pos[0], y + logo_pos[1])
+    else:
+        radius = diameter // 4
+        points = [(x + center + radius * math.cos(math.radians(60 * i)),
+                   y + center + radius * math.sin(math.radians(60 * i))) for i in range(6)]
+        canvas.polygon(points, (0, 48, 92, 180))
+
+
+def _qr(canvas, context, at, anchor, size, version, box_size, fill, back, opacity):
+    if context["scheme"] == ED25519:
+        version, box_size = None, None
+    qr = make_qr(context["qr_payload"], size, version, box_size)
+    matrix = qr.get_matrix()
+    box = qr.box_size
+    side = len(matrix) * box
+    x, y = anchor_position(at, anchor, (side, side))
+
+    canvas.rect(x, y, side, side, back)
+    # ماژول‌های تیره هر سطر به صورت نوارهای افقی پیوسته
+    paths = []
+    for row, modules in enumerate(matrix):
+        col = 0
+        while col < len(modules):
+            if not modules[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(modules) and modules[col]:
+                col += 1
+            paths.append(f"{_n(x + start * box)} {_n(canvas._y(y + (row + 1) * box))} "
+                         f"{_n((col - start) * box)} {_n(box)} re")
+    canvas._paint(fill, "f", " ".join(paths))
+
+    # Holographic stripes: one rectangle per run of equal column alpha
+    columns = hologram_columns(side, opacity=opacity)
+    col = 0
+    while col < side:
+        alpha = int(columns[col])
+        start = col
+        while col < side and columns[col] == alpha:
+            col += 1
+        if alpha:
+            canvas.rect(x + start, y, col - start, side, (100, 200, 255, alpha))
+
+
+VECTOR_OPS = {
+    "text": _text, "aligned": _aligned, "field": _field, "chunk": _chunk,
+    "line": _line, "rect": _rect, "seal": _seal, "qr": _qr,
+}
+
+
+def _watermarks(canvas, options):
+    atlas = get_atlas(options["font"], options["box"], options["offset"])
+    box_w, box_h = options["box"]
+    offset_x, offset_y = options["offset"]
+    fill = options["fill"]
+    for text, alpha, angle, x, y, sprite in watermark_placements(
+            (canvas.width, canvas.height), options["texts"], options["count"], atlas, fill,
+            options["alpha_range"], options["angle_range"]):
+        # مرکز sprite چرخانده‌شده همان مرکز کادر متن است
+        h, w = sprite.shape
+        center_x, center_y = x + w / 2, y + h / 2
+        canvas.text((center_x - box_w / 2 + offset_x, center_y - box_h / 2 + offset_y), text,
+                    options["font"], (*fill[:3], alpha), angle=angle, origin=(center_x, center_y))
+
+
+def _background(canvas, template):
+    background = template.spec.get("background", {})
+    canvas.rect(0, 0, canvas.width, canvas.height, tuple(background.get("color", (255, 255, 255))))
+    grid = background.get("grid")
+    if grid:
+        for i in range(0, canvas.width, grid):
+            canvas.line([(i, 0), (i, canvas.height)], (200, 200, 200))
+        for i in range(0, canvas.height, grid):
+            canvas.line([(0, i), (canvas.width, i)], (200, 200, 200))
+    texture = background.get("texture")
+    if texture and texture.get("count"):
+        size, count, seed = (canvas.width, canvas.height), texture["count"], texture.get("seed")
+        canvas.image(lambda: paper_texture(*size, count=count, seed=seed), 0, 0,
+                     key=("texture", size, count, seed))
+
+
+def render_pdf(cert_info, private_key, scheme=None, template=None, page=DEFAULT_PAGE):
+    """Render one certificate as a vector PDF page.
+
+    Returns (pdf bytes, digital_signature, verification_code). The signed
+    payload is stored in the document info dictionary under /certgen.
+    """
+    template = load_template(template or DEFAULT_TEMPLATE)
+    with span("sign"):
+        context = template.record_context(cert_info, private_key, scheme)
+
+    with span("pdf"):
+        doc = PdfDocument()
+        catalog, pages = doc.reserve(), doc.reserve()
+        canvas = PdfCanvas(doc, template.size, PAGE_SIZES.get(page, page))
+        _background(canvas, template)
+        static, variable = template.layout(cert_info)
+        for kind, args in static + variable:
+            VECTOR_OPS[kind](canvas, context, *args)
+        watermarks = template.watermark_options(context)
+        if watermarks:
+            _watermarks(canvas, watermarks)
+
+        page_object = canvas.finish(pages)
+        doc.add(f"<< /Type /Pages /Kids [{page_object} 0 R] /Count 1 >>", pages)
+        doc.add(f"<< /Type /Catalog /Pages {pages} 0 R >>", catalog)
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("D:%Y%m%d%H%M%SZ")
+        info = doc.add(
+            b"<< /Title " + _pdf_text_string(f"Certificate {cert_info['Certificate ID']}")
+            + b" /Producer (certgen) /CreationDate (" + now.encode("ascii") + b")"
+            + f" /{METADATA_KEY} ".encode("ascii") + _pdf_text_string(template.metadata(cert_info, context))
+            + b" >>")
+        data = doc.tobytes(catalog, info)
+    return data, context["digital_signature"], context["verification_code"]
+
+
+def save_pdf(data, cert_info, output_dir="."):
+    output_filename = certificate_filename(cert_info, output_dir, PDF_MODE)
+    with open(output_filename, "wb") as f:
+        f.write(data)
+    return output_filename
+
+# ======== Comparison with Upscaled Raster ========
+def compare(cert_info, private_key, template=None, page=DEFAULT_PAGE, dpi=PRINT_DPI):
+    """{"pdf": (bytes, ms), "raster": (bytes, ms)} for one print-size certificate.
+
+    The raster side renders at the template size, upscales to fill `page`
+    at `dpi` and encodes a PNG, which is what print output needed before.
+    """
+    template = load_template(template or DEFAULT_TEMPLATE)
+    start = time.perf_counter()
+    data = render_pdf(cert_info, private_key, template=template, page=page)[0]
+    pdf = (len(data), (time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    image = render_certificate(cert_info, private_key, template=template)[0]
+    page_size = PAGE_SIZES.get(page, page)
+    scale = min(page_size[0] / image.width, page_size[1] / image.height) * dpi / 72
+    image = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    buffer = io.BytesIO()
+    encode(image, buffer)
+    raster = (buffer.tell(), (time.perf_counter() - start) * 1000)
+    return {"pdf": pdf, "raster": raster}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a sample certificate as a vector PDF.")
+    parser.add_argument("-t", "--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("-p", "--page", choices=sorted(PAGE_SIZES), default=DEFAULT_PAGE)
+    parser.add_argument("-o", "--output-dir", default=".")
+    parser.add_argument("--compare", action="store_true",
+                        help=f"also time an upscaled {PRINT_DPI} dpi PNG of the same page")
+    args = parser.parse_args(argv)
+
+    # نمونه با کلید و رکورد ثابت bench؛ نه شناسه واقعی اجاره می‌شود و نه کلیدی روی دیسک نوشته می‌شود
+    from .bench import golden_cert_info, golden_key
+
+    private_key, cert_info = golden_key(), golden_cert_info()
+    if args.compare:
+        for name, (size, ms) in compare(cert_info, private_key, args.template, args.page).items():
+            print(f"{name:<7} {size:>10} bytes {ms:>9.1f} ms")
+        return 0
+    data = render_pdf(cert_info, private_key, template=args.template, page=args.page)[0]
+    print(f"✅ PDF certificate created: {save_pdf(data, cert_info, args.output_dir)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
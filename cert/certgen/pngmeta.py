@@ -0,0 +1,96 @@
+import json
+import struct
+import zlib
+
+from PIL import PngImagePlugin
+
+# ======== Signed PNG Metadata ========
+# داده امضاشده، امضا و Key ID در یک چانک iTXt قبل از IDAT ذخیره می‌شوند تا
+# تأییدکننده بدون decode پیکسل‌ها و QR بتواند امضا را بررسی کند.
+METADATA_KEY = "certgen"
+METADATA_VERSION = 1
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def certificate_metadata(data_string, digital_signature, verification_code, key_id, scheme):
+    """JSON text for the iTXt chunk; `data_string` is the exact signed payload."""
+    return json.dumps({
+        "v": METADATA_VERSION,
+        "payload": data_string.decode("utf-8"),
+        "signature": digital_signature,
+        "verification_code": verification_code,
+        "key_id": key_id,
+        "scheme": scheme,
+    }, ensure_ascii=False, separators=(",", ":"))
+
+
+def pnginfo(image):
+    """PngInfo carrying the metadata attached to `image.info`, or None."""
+    text = image.info.get(METADATA_KEY)
+    if not text:
+        return None
+    info = PngImagePlugin.PngInfo()
+    info.add_itxt(METADATA_KEY, text)
+    return info
+
+
+def _parse_itxt(data):
+    keyword, _, rest = data.partition(b"\0")
+    if keyword.decode("latin-1") != METADATA_KEY or len(rest) < 2:
+        return None
+    compressed, rest = rest[0], rest[2:]
+    _, _, rest = rest.partition(b"\0")   # language tag
+    _, _, text = rest.partition(b"\0")   # translated keyword
+    if compressed:
+        text = zlib.decompress(text)
+    return text.decode("utf-8")
+
+
+def _read_metadata(f):
+    if f.read(8) != PNG_SIGNATURE:
+        return None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            return None
+        if chunk_type != b"iTXt":
+            f.seek(length + 4, 1)
+            continue
+        data = f.read(length)
+        crc = f.read(4)
+        if len(crc) < 4 or zlib.crc32(chunk_type + data) != struct.unpack(">I", crc)[0]:
+            return None
+        text = _parse_itxt(data)
+        if text is None:
+            continue
+        try:
+            metadata = json.loads(text)
+        except ValueError:
+            return None
+        return metadata if metadata.get("v") == METADATA_VERSION else None
+
+
+def read_metadata(source):
+    """The metadata dict from a path or binary file object, or None if it has none.
+
+    Only the chunk headers before the first IDAT are read; pixel data is
+    never touched.
+    """
+    if hasattr(source, "read"):
+        source.seek(0)
+        return _read_metadata(source)
+    with open(source, "rb") as f:
+        return _read_metadata(f)
+
+
+def payload_fields(payload):
+    """cert_info dict parsed back from a canonical "key: value" payload."""
+    fields = {}
+    for line in payload.split("\n"):
+        key, sep, value = line.partition(": ")
+        if sep:
+            fields[key] = value
+    return fields
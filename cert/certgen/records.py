@@ -0,0 +1,43 @@
+import csv
+import json
+
+# ======== Certificate Records ========
+# خواندن رکوردها و ترتیب فیلدها بدون هیچ وابستگی؛ verifier، سرویس و اسکریپت QR
+# این ماژول را import می‌کنند بدون اینکه Pillow، qrcode یا cryptography بار شوند.
+
+# ترتیب فیلدها بخشی از داده امضا شده است و نباید تغییر کند
+CERT_FIELDS = [
+    "Name", "Last Name", "User ID", "Membership Date", "Issued Date",
+    "Certificate ID", "Signed By", "Model ID", "Issuer"
+]
+
+
+def iter_records(path):
+    """Yield records from a CSV or JSONL file one at a time."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                yield record
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def order_cert_info(record):
+    """`record` as a cert_info dict in signing order, without filling anything in.
+
+    Raises ValueError when a CERT_FIELDS entry is missing or empty; used by
+    the verifier, which must never invent dates or lease IDs.
+    """
+    values = {k: str(v) for k, v in record.items() if v not in (None, "")}
+    missing = [k for k in CERT_FIELDS if k not in values]
+    if missing:
+        raise ValueError(f"missing certificate fields: {', '.join(missing)}")
+
+    cert_info = {k: values.pop(k) for k in CERT_FIELDS}
+    cert_info.update(values)
+    return cert_info
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import time
+
+# ======== Certificate Registry ========
+# هر گواهی صادرشده با cert_info، امضا و کد تأییدش در SQLite (حالت WAL) ثبت
+# می‌شود؛ جستجو با Certificate ID، کد تأیید یا نام گیرنده از روی ایندکس است.
+REGISTRY_PATH = "certificates.sqlite3"
+BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    certificate_id    TEXT PRIMARY KEY,
+    verification_code TEXT NOT NULL,
+    recipient         TEXT NOT NULL,
+    cert_info         TEXT NOT NULL,
+    signature         TEXT NOT NULL,
+    key_id            TEXT,
+    scheme            TEXT,
+    output            TEXT,
+    issued_at         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS certificates_verification_code ON certificates (verification_code);
+CREATE INDEX IF NOT EXISTS certificates_recipient ON certificates (recipient COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS reservations (
+    certificate_id TEXT PRIMARY KEY,
+    reserved_at    REAL NOT NULL
+);
+"""
+
+_COLUMNS = ("certificate_id", "verification_code", "recipient", "cert_info", "signature",
+            "key_id", "scheme", "output", "issued_at")
+
+
+def recipient_name(cert_info):
+    return " ".join(filter(None, (cert_info.get("Name"), cert_info.get("Last Name"))))
+
+
+class Registry:
+    """SQLite store of issued certificates.
+
+    Writes are buffered and committed `batch_size` at a time (and on
+    flush/close); lookups return the stored row as a dict with `cert_info`
+    decoded, or None. An issuance is never overwritten: batch workers
+    reserve() each Certificate ID before rendering it, and an ID that is
+    still found registered on flush is left as it was and collected in
+    `conflicts`.
+    """
+
+    def __init__(self, path=REGISTRY_PATH, batch_size=BATCH_SIZE, readonly=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.conflicts = []
+        if readonly:
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(_SCHEMA)
+        self.db.row_factory = sqlite3.Row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, cert_info, signature, verification_code, key_id=None, scheme=None,
+            output=None, issued_at=None):
+        self.pending.append((
+            cert_info["Certificate ID"], verification_code, recipient_name(cert_info),
+            json.dumps(cert_info, ensure_ascii=False), signature, key_id, scheme, output,
+            issued_at or time.time(),
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def reserve(self, certificate_id):
+        """Claim `certificate_id` before its certificate is rendered.
+
+        Returns False when it is already registered or claimed by another
+        issuance (in this or any other process); the claim is dropped when
+        the row is flushed, or by release() when rendering fails.
+        """
+        try:
+            with self.db:
+                if self.db.execute("SELECT 1 FROM certificates WHERE certificate_id = ?",
+                                   (certificate_id,)).fetchone():
+                    return False
+                self.db.execute("INSERT INTO reservations (certificate_id, reserved_at) VALUES (?, ?)",
+                                (certificate_id, time.time()))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def release(self, certificate_id):
+        with self.db:
+            self.db.execute("DELETE FROM reservations WHERE certificate_id = ?", (certificate_id,))
+
+    def flush(self):
+        """Commit buffered rows; returns the Certificate IDs rejected as already registered."""
+        if not self.pending:
+            return []
+        conflicts = []
+        sql = (f"INSERT INTO certificates ({', '.join(_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(_COLUMNS))})")
+        with self.db:
+            for row in self.pending:
+                try:
+                    self.db.execute(sql, row)
+                except sqlite3.IntegrityError:
+                    conflicts.append(row[0])
+                    continue
+                self.db.execute("DELETE FROM reservations WHERE certificate_id = ?", (row[0],))
+        self.pending = []
+        self.conflicts.extend(conflicts)
+        return conflicts
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def _one(self, column, value):
+        row = self.db.execute(f"SELECT * FROM certificates WHERE {column} = ?", (value,)).fetchone()
+        return _entry(row)
+
+    def by_id(self, certificate_id):
+        return self._one("certificate_id", certificate_id)
+
+    def by_verification_code(self, verification_code):
+        return self._one("verification_code", verification_code)
+
+    def by_recipient(self, name):
+        rows = self.db.execute(
+            "SELECT * FROM certificates WHERE recipient = ? COLLATE NOCASE ORDER BY issued_at",
+            (name,))
+        return [_entry(row) for row in rows]
+
+    def find(self, certificate_id=None, verification_code=None):
+        """cert_info by Certificate ID, else by verification code (same interface as RecordIndex)."""
+        entry = None
+        if certificate_id:
+            entry = self.by_id(certificate_id)
+        if entry is None and verification_code:
+            entry = self.by_verification_code(verification_code)
+        return entry["cert_info"] if entry else None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+
+
+def _entry(row):
+    if row is None:
+        return None
+    entry = dict(row)
+    entry["cert_info"] = json.loads(entry["cert_info"])
+    return entry
@@ -0,0 +1,274 @@
+from PIL import Image, ImageDraw, ImageFilter
+import hashlib
+import math
+import os
+import base64
+import datetime
+
+from .effects import paper_texture, hologram_overlay
+from .signing import canonical_payload, sign
+from . import fonts
+from .ids import allocate_id
+from .output import encode, extension, DEFAULT_MODE
+from .records import order_cert_info
+
+# ======== Enhanced Configurations ========
+CERT_WIDTH, CERT_HEIGHT = 1200, 900
+MARGIN = 40
+BACKGROUND_COLOR = (248, 246, 240)
+BORDER_COLOR = (30, 30, 30)
+TITLE_COLOR = (15, 15, 15)
+TEXT_COLOR = (35, 35, 35)
+WATERMARK_COLOR = (40, 40, 40, 20)
+NOISE_INTENSITY = 4500
+PAPER_TEXTURE_OPACITY = 0.15
+TEXTURE_SEED = 2023
+HOLOGRAM_OPACITY = 0.35
+FINAL_FILTER = "fused"  # effects.FILTER_MODES
+
+TITLE = "CERTIFICATE OF AUTHENTICITY"
+SUBTITLE = "Issued by OpenAI for Distinguished Contribution"
+SIGNATORY = "Dr. Sam Altman, Chief Executive Officer"
+SEAL_LOGO_PATH = "openai_seal.png"
+
+# ======== Certificate Information ========
+DEFAULT_FIELDS = {
+    "Signed By": "ChatGPT-4o",
+    "Model ID": "GPT4O-REP-TRUST-2025",
+    "Issuer": "OpenAI, Inc."
+}
+
+
+def new_certificate_id():
+    # یک‌شماره‌ای اجاره می‌شود تا اجراهای تکی cert12 شماره هدر ندهند؛ batch بلوک بزرگ می‌گیرد
+    return allocate_id(block_size=1)
+
+
+def normalize_cert_info(record, new_id=new_certificate_id):
+    """Return `record` as an ordered cert_info dict with defaults filled in.
+
+    Records without a Certificate ID get one from `new_id()`.
+    """
+    values = dict(DEFAULT_FIELDS)
+    values["Issued Date"] = datetime.datetime.now().strftime("%B %d, %Y")
+    values.update({k: str(v) for k, v in record.items() if v not in (None, "")})
+    if "Certificate ID" not in values:
+        values["Certificate ID"] = new_id()
+
+    return order_cert_info(values)
+
+
+def default_cert_info():
+    return normalize_cert_info({
+        "Name": "Yasin",
+        "Last Name": "Aryanfard",
+        "User ID": "YSNRFD",
+        "Membership Date": "April 1, 2023",
+    })
+
+# ======== Enhanced Font Loading ========
+FALLBACK_FONTS = (
+    "arial.ttf", "arialbd.ttf", "times.ttf", "timesbd.ttf",
+    "cour.ttf", "courbd.ttf", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"
+)
+
+
+def load_font(name, size):
+    # مسیر فونت از ایندکس فونت‌های سیستم خوانده می‌شود و هر (نام، اندازه) فقط یک بار ساخته می‌شود
+    return fonts.load_font(name, size, FALLBACK_FONTS)
+
+# ======== Digital Signature Generation ========
+def sign_cert_info(private_key, cert_info, scheme=None):
+    data_string = canonical_payload(cert_info)
+    signature = sign(private_key, data_string, scheme)
+
+    digital_signature = base64.b64encode(signature).decode('utf-8')
+    verification_code = f"VER-{hashlib.sha3_256(data_string).hexdigest()[:10].upper()}"
+    return digital_signature, verification_code
+
+# ======== QR Code Generation ========
+def make_qr(data, size=220, version=7, box_size=10):
+    """Fitted qrcode.QRCode for `data`; the raster and PDF backends draw its modules."""
+    # qrcode فقط هنگام ساخت QR لازم است؛ import ماژول برای verifier و workerها سبک می‌ماند
+    import qrcode
+
+    # box_size=None: اندازه ماژول طوری انتخاب می‌شود که QR حدوداً size پیکسل شود
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=box_size or 1,
+        border=4
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    if box_size is None:
+        qr.box_size = max(4, size // (qr.modules_count + 2 * qr.border))
+    return qr
+
+
+def create_qr_code(data, size=220, version=7, box_size=10, fill_color="#002855",
+                   back_color="#F8F6F0", hologram_opacity=HOLOGRAM_OPACITY):
+    qr = make_qr(data, size, version, box_size)
+    qr_img = qr.make_image(
+        fill_color=fill_color,
+        back_color=back_color
+    ).convert("RGBA")
+
+    # Add holographic effect
+    # HOLOGRAM_OPACITY keeps the stripes from drowning the modules for the scanner
+    hologram = hologram_overlay(qr_img.width, qr_img.height, opacity=hologram_opacity)
+
+    return Image.alpha_composite(qr_img, hologram)
+
+# ======== Background Design ========
+def create_certificate_base(size=(CERT_WIDTH, CERT_HEIGHT), color=BACKGROUND_COLOR, grid=40,
+                            texture_count=15000, seed=TEXTURE_SEED):
+    # Base with gradient
+    width, height = size
+    base = Image.new("RGB", size, color)
+    draw = ImageDraw.Draw(base)
+
+    # Draw subtle grid
+    for i in range(0, width, grid) if grid else ():
+        alpha = 15 if i % (3 * grid) == 0 else 8
+        draw.line([(i, 0), (i, height)], fill=(200, 200, 200, alpha), width=1)
+    for i in range(0, height, grid) if grid else ():
+        alpha = 15 if i % (3 * grid) == 0 else 8
+        draw.line([(0, i), (width, i)], fill=(200, 200, 200, alpha), width=1)
+
+    # Add paper texture
+    texture = paper_texture(width, height, count=texture_count, seed=seed)
+
+    return Image.alpha_composite(base.convert("RGBA"), texture).convert("RGB")
+
+# ======== Official Seal with OpenAI Logo ========
+SEAL_TEXT = "OFFICIAL SEAL • VERIFIED • DIGITAL"
+
+
+def seal_shapes(diameter=200, font_seal=None):
+    """The seal's geometry as ("ellipse"|"line"|"arc"|"text", ...) tuples in drawing order."""
+    shapes = []
+    center = diameter // 2
+
+    # Complex seal pattern
+    for i in range(1, 15):
+        alpha = int(255 * (1 - i/15))
+        radius = center - i*3
+        color = (0, 48, 92, alpha)
+        shapes.append(("ellipse",
+                       [(center - radius, center - radius), (center + radius, center + radius)],
+                       color, 2))
+
+    # Ornate details
+    num_points = 24
+    for i in range(num_points):
+        angle = math.radians(i * 360/num_points)
+        x1 = center + int((diameter*0.42) * math.cos(angle))
+        y1 = center + int((diameter*0.42) * math.sin(angle))
+        x2 = center + int((diameter*0.47) * math.cos(angle))
+        y2 = center + int((diameter*0.47) * math.sin(angle))
+        shapes.append(("line", [(x1, y1), (x2, y2)], (0, 48, 92, 220), 3))
+
+    # Add holographic effect
+    for i in range(0, diameter, 4):
+        alpha = int(180 * (0.4 + 0.6 * abs(math.sin(i/20))))
+        shapes.append(("arc", [(i//4, i//4), (diameter-i//4, diameter-i//4)], (100, 200, 255, alpha), 2))
+
+    # Seal text
+    font_seal = font_seal or load_font("timesbd.ttf", 14)
+    for i, char in enumerate(SEAL_TEXT):
+        angle = math.radians(i * 360/len(SEAL_TEXT) - 90)
+        x = center + int(center*0.65 * math.cos(angle)) - 5
+        y = center + int(center*0.65 * math.sin(angle)) - 5
+        shapes.append(("text", (x, y), char, font_seal, (0, 48, 92, 255)))
+    return shapes
+
+
+def seal_logo(diameter=200, logo_path=SEAL_LOGO_PATH):
+    """(glow, glow position, logo, logo position) for the seal centre, or None without a logo."""
+    center = diameter // 2
+    try:
+        logo = Image.open(logo_path).convert("RGBA")
+    except Exception as e:
+        print(f"⚠️ Could not load {logo_path}: {e}")
+        return None
+    logo_size = diameter // 2  # Size relative to seal diameter
+    logo.thumbnail((logo_size, logo_size), Image.LANCZOS)
+    logo_pos = (center - logo.width // 2, center - logo.height // 2)
+
+    # Create glow effect around logo
+    glow = Image.new("RGBA", (logo.width+10, logo.height+10), (0,0,0,0))
+    glow_draw = ImageDraw.Draw(glow)
+    glow_draw.ellipse([(0,0), (logo.width+10, logo.height+10)],
+                     fill=(100, 200, 255, 60))
+    glow = glow.filter(ImageFilter.GaussianBlur(radius=5))
+    return glow, (logo_pos[0]-5, logo_pos[1]-5), logo, logo_pos
+
+
+def create_official_seal(diameter=200, font_seal=None, logo_path=SEAL_LOGO_PATH):
+    seal = Image.new("RGBA", (diameter, diameter), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(seal)
+    center = diameter // 2
+
+    for kind, *args in seal_shapes(diameter, font_seal):
+        if kind == "ellipse":
+            box, color, width = args
+            draw.ellipse(box, outline=color, width=width)
+        elif kind == "line":
+            points, color, width = args
+            draw.line(points, fill=color, width=width)
+        elif kind == "arc":
+            box, color, width = args
+            draw.arc(box, start=0, end=360, fill=color, width=width)
+        else:
+            xy, char, font, color = args
+            draw.text(xy, char, font=font, fill=color)
+
+    # Add OpenAI logo to center of seal
+    logo = seal_logo(diameter, logo_path)
+    if logo is not None:
+        # Paste glow then logo
+        glow, glow_pos, logo, logo_pos = logo
+        seal.paste(glow, glow_pos, glow)
+        seal.paste(logo, logo_pos, logo)
+    else:
+        # Draw simple OpenAI-inspired logo as fallback
+        draw.regular_polygon((center, center, diameter//4),
+                            n_sides=6,
+                            fill=(0, 48, 92, 180))
+
+    return seal
+
+# ======== Main Certificate Creation ========
+def render_certificate(cert_info, private_key, scheme=None, final_filter=FINAL_FILTER, template=None):
+    """Render one certificate and return (image, digital_signature, verification_code).
+
+    The layout comes from `template` (a name in templates/, a template file
+    or a compiled Template; default cert12). `scheme` defaults to the key's
+    natural scheme: RSA-PSS/SHA-512 for RSA keys, Ed25519 for Ed25519 keys.
+    `final_filter` is "fused" (one 5x5 pass over the finished image),
+    "layers" (only the cached static layer is filtered; values, QR and
+    watermarks stay crisp) or "legacy" (SMOOTH then SHARPEN).
+    """
+    # قالب به این ماژول وابسته است؛ import در زمان اجرا از چرخه جلوگیری می‌کند
+    from .template import load_template, DEFAULT_TEMPLATE
+
+    return load_template(template or DEFAULT_TEMPLATE).render(cert_info, private_key, scheme, final_filter)
+
+
+def certificate_filename(cert_info, output_dir=".", mode=DEFAULT_MODE):
+    return os.path.join(output_dir, f"OpenAI_Certificate_{cert_info['Certificate ID']}{extension(mode)}")
+
+
+def save_certificate(certificate, cert_info, output_dir=".", mode=DEFAULT_MODE, writer=None):
+    """Encode `certificate` in one of output.OUTPUT_MODES; returns the file name.
+
+    With `writer` (a BackgroundWriter) the encode is queued and this returns
+    immediately; the caller waits on the writer.
+    """
+    output_filename = certificate_filename(cert_info, output_dir, mode)
+    if writer is not None:
+        writer.submit(certificate, output_filename)
+    else:
+        encode(certificate, output_filename, mode)
+    return output_filename
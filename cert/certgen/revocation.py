@@ -0,0 +1,184 @@
+import argparse
+import bisect
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+# ======== Revocation List ========
+# فهرست گواهی‌های باطل‌شده به یک فیلتر Bloom فشرده و جدول مرتب هش‌ها کامپایل
+# می‌شود؛ هر دو در یک فایل (header | bloom | digests) هستند تا با یک rename جایگزین
+# شوند و خواننده هرگز فیلتر و جدول دو نسخه مختلف را نبیند. فایل mmap می‌شود؛ فیلتر
+# در زمان ثابت جواب «نه» می‌دهد و فقط در صورت برخورد، جدول با جستجوی دودویی بررسی می‌شود.
+REVOCATION_PATH = "revoked_certificates"
+BLOOM_SUFFIX = ".bloom"
+BLOOM_MAGIC = b"CGBF"
+BLOOM_HEADER = ">4sBxxxQIQ"  # magic, version, bit count, hash count, item count
+BLOOM_VERSION = 2  # 1: جدول هش‌ها در فایل جداگانه .digests
+DIGEST_SIZE = 16
+FALSE_POSITIVE_RATE = 0.001
+
+
+def revocation_digest(certificate_id):
+    return hashlib.blake2b(certificate_id.encode("utf-8"), digest_size=DIGEST_SIZE,
+                           person=b"certgen-revoke").digest()
+
+
+def bloom_parameters(count, false_positive_rate=FALSE_POSITIVE_RATE):
+    """(bit count, hash count) for `count` items at the given false-positive rate."""
+    count = max(count, 1)
+    bits = math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 63) // 64 * 64)
+    hashes = max(1, round(bits / count * math.log(2)))
+    return bits, hashes
+
+
+def _split(digests):
+    # دو هش ۶۴ بیتی از هر digest؛ اندیس‌ها با درهم‌سازی دوگانه ساخته می‌شوند
+    h1 = digests[:, :8].copy().view(">u8").astype(np.uint64).ravel()
+    h2 = digests[:, 8:].copy().view(">u8").astype(np.uint64).ravel() | np.uint64(1)
+    return h1, h2
+
+
+def compile_revocations(certificate_ids, path=REVOCATION_PATH,
+                        false_positive_rate=FALSE_POSITIVE_RATE):
+    """Write `path`.bloom (filter and sorted digests) for `certificate_ids`; returns the item count."""
+    digests = sorted({revocation_digest(i) for i in certificate_ids})
+    table = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+    bits, hashes = bloom_parameters(len(digests), false_positive_rate)
+
+    bloom = np.zeros(bits // 8, dtype=np.uint8)
+    if len(digests):
+        h1, h2 = _split(table)
+        for i in range(hashes):
+            index = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+            np.bitwise_or.at(bloom, (index >> np.uint64(3)).astype(np.intp),
+                             (1 << (index & np.uint64(7))).astype(np.uint8))
+
+    header = struct.pack(BLOOM_HEADER, BLOOM_MAGIC, BLOOM_VERSION, bits, hashes, len(digests))
+    _write_atomic(path + BLOOM_SUFFIX, header + bloom.tobytes() + table.tobytes())
+    return len(digests)
+
+
+def _write_atomic(path, data):
+    # نام موقت یکتا تا چند کامپایل هم‌زمان فایل یکدیگر را بازنویسی نکنند
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _Digests:
+    """Sequence view over the sorted digests that follow the filter, for bisect."""
+
+    def __init__(self, data, offset):
+        self.data = data
+        self.offset = offset
+
+    def __len__(self):
+        return (len(self.data) - self.offset) // DIGEST_SIZE
+
+    def __getitem__(self, i):
+        start = self.offset + i * DIGEST_SIZE
+        return self.data[start:start + DIGEST_SIZE]
+
+
+class RevocationList:
+    """Memory-mapped revocation filter; `certificate_id in revocations` is the check."""
+
+    def __init__(self, path=REVOCATION_PATH):
+        self.bloom = _map(path + BLOOM_SUFFIX)
+        self.header_size = struct.calcsize(BLOOM_HEADER)
+        if len(self.bloom) < self.header_size:
+            raise ValueError(f"not a certgen revocation filter: {path}{BLOOM_SUFFIX}")
+        magic, version, self.bits, self.hashes, self.count = struct.unpack_from(BLOOM_HEADER, self.bloom)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"not a certgen revocation filter: {path}{BLOOM_SUFFIX}")
+        if version != BLOOM_VERSION:
+            raise ValueError(f"revocation filter version {version} is not supported; recompile {path}")
+        self.digests = _Digests(self.bloom, self.header_size + self.bits // 8)
+        if len(self.digests) != self.count:
+            raise ValueError(f"revocation filter is truncated: {path}{BLOOM_SUFFIX}")
+
+    def might_contain(self, digest):
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hashes):
+            index = (h1 + i * h2) % (1 << 64) % self.bits
+            if not self.bloom[self.header_size + (index >> 3)] & (1 << (index & 7)):
+                return False
+        return True
+
+    def __contains__(self, certificate_id):
+        digest = revocation_digest(certificate_id)
+        if not self.might_contain(digest):
+            return False
+        # تأیید دقیق فقط برای برخوردهای فیلتر
+        i = bisect.bisect_left(self.digests, digest)
+        return i < len(self.digests) and self.digests[i] == digest
+
+    def __len__(self):
+        return self.count
+
+
+def load_revocations(path=REVOCATION_PATH):
+    """RevocationList at `path`, or None if it has not been compiled."""
+    if not os.path.exists(path + BLOOM_SUFFIX):
+        return None
+    return RevocationList(path)
+
+
+def iter_ids(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile or query the certificate revocation list.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_parser = sub.add_parser("compile", help="compile a file of revoked Certificate IDs (one per line)")
+    compile_parser.add_argument("ids")
+    compile_parser.add_argument("-o", "--output", default=REVOCATION_PATH)
+    compile_parser.add_argument("--fp-rate", type=float, default=FALSE_POSITIVE_RATE)
+    check_parser = sub.add_parser("check", help="check Certificate IDs against a compiled list")
+    check_parser.add_argument("certificate_ids", nargs="+")
+    check_parser.add_argument("-l", "--list", default=REVOCATION_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        count = compile_revocations(iter_ids(args.ids), args.output, args.fp_rate)
+        print(f"✅ {count} revoked IDs compiled to {args.output}{BLOOM_SUFFIX}", file=sys.stderr)
+        return 0
+
+    revocations = RevocationList(args.list)
+    revoked = False
+    for certificate_id in args.certificate_ids:
+        status = "revoked" if certificate_id in revocations else "not revoked"
+        revoked = revoked or status == "revoked"
+        print(f"{certificate_id}: {status}")
+    return 1 if revoked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
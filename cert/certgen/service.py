@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from .revocation import BLOOM_SUFFIX
+from .verify import verify_data, worker_pool, PUBLIC_KEY_PATHS, NOISE_INTENSITY
+
+# ======== Verification Service ========
+# سرویس HTTP محلی و ماندگار: کلیدها و سوابق در workerها بارگذاری‌شده می‌مانند،
+# نتیجه هر تصویر با هش محتوایش کش می‌شود و شمارنده‌ها در /metrics هستند.
+# نتیجه‌های خطا کش نمی‌شوند و هر نتیجه کش‌شده با تغییر registry یا فهرست ابطال
+# (mtime، اندازه و inode فایل‌هایشان) باطل می‌شود.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8808
+CACHE_SIZE = 10000
+MAX_BODY = 32 * 1024 * 1024
+LATENCY_WINDOW = 10000
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+            500: "Internal Server Error"}
+
+
+def file_state(paths):
+    """(mtime, size, inode) of each existing file in `paths`; changes whenever one is rewritten."""
+    state = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            state.append(None)
+            continue
+        state.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(state)
+
+
+class ResultCache:
+    """LRU of verification results keyed by (content hash, options).
+
+    Each entry remembers the data-source `state` it was computed under
+    (see file_state) and is only returned while that state is unchanged.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = collections.OrderedDict()
+
+    def get(self, key, state=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != state:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, result, state=None):
+        if self.size <= 0:
+            return
+        self.entries[key] = (state, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def observe(self, seconds):
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "counters": dict(self.counters),
+            "requests_per_second": round(self.counters["requests"] / uptime, 3) if uptime else 0.0,
+            "verifications_per_second": round(self.counters["verifications"] / uptime, 3) if uptime else 0.0,
+            "latency_ms": {
+                "count": len(latencies),
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 3) if latencies else None,
+            },
+        }
+
+
+class VerificationService:
+    """Verifies uploaded certificate images on a process pool.
+
+    POST /verify   body = image bytes; ?optical=1 skips the PNG metadata
+                   fast path, ?name=<file name> helps the record lookup
+    GET  /metrics  counters and latency percentiles
+    GET  /healthz
+    """
+
+    def __init__(self, pool, cache_size=CACHE_SIZE, state_paths=()):
+        self.pool = pool
+        self.cache = ResultCache(cache_size)
+        self.metrics = Metrics()
+        self.inflight = {}
+        # فایل‌هایی که نتیجه به آن‌ها بستگی دارد (registry و WAL آن، فهرست ابطال)
+        self.state_paths = tuple(state_paths)
+
+    async def verify(self, data, name=None, use_metadata=True):
+        key = (hashlib.sha256(data).hexdigest(), use_metadata, name)
+        state = file_state(self.state_paths)
+        result = self.cache.get(key, state)
+        if result is not None:
+            self.metrics.counters["cache_hits"] += 1
+            return result
+
+        # درخواست‌های هم‌زمان برای یک تصویر فقط یک بار بررسی می‌شوند
+        future = self.inflight.get(key)
+        if future is None:
+            self.metrics.counters["cache_misses"] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, verify_data, data, name, use_metadata)
+            self.inflight[key] = future
+            try:
+                result = await future
+            finally:
+                del self.inflight[key]
+            # خطاها (مثلاً سابقه‌ای که هنوز ثبت نشده) دوباره بررسی می‌شوند
+            if result["status"] != "error":
+                self.cache.put(key, result, state)
+            self.metrics.counters["verifications"] += 1
+            self.metrics.counters[f"status_{result['status']}"] += 1
+            return result
+        self.metrics.counters["inflight_joins"] += 1
+        return await asyncio.shield(future)
+
+    async def handle(self, method, target, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/healthz":
+            return 200, {"status": "ok"}
+        if url.path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if url.path != "/verify":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST with the image as the request body"}
+        if not body:
+            return 400, {"error": "empty request body"}
+        use_metadata = query.get("optical", ["0"])[0] not in ("1", "true", "yes")
+        name = query.get("name", [None])[0]
+        return 200, await self.verify(body, name, use_metadata)
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                status, method, target, headers, body = request
+                start = time.perf_counter()
+                if status is None:
+                    try:
+                        status, payload = await self.handle(method, target, body)
+                    except Exception as e:
+                        self.metrics.counters["errors"] += 1
+                        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                else:
+                    payload = {"error": _REASONS[status]}
+                self.metrics.counters["requests"] += 1
+                self.metrics.counters[f"http_{status}"] += 1
+                if target and target.startswith("/verify"):
+                    self.metrics.observe(time.perf_counter() - start)
+
+                keep_alive = headers.get("connection", "").lower() != "close" and status < 500
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+# ======== HTTP/1.1 ========
+async def _read_request(reader):
+    """(error_status or None, method, target, headers, body), or None at EOF."""
+    try:
+        line = await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # خط درخواست از محدودیت StreamReader بلندتر است
+        return 431, None, None, {"connection": "close"}, b""
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        return 400, None, None, {}, b""
+    method, target, _ = parts
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            return 431, method, target, {"connection": "close"}, b""
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    if method != "POST":
+        return None, method, target, headers, b""
+    if "content-length" not in headers:
+        return 411, method, target, {"connection": "close"}, b""
+    try:
+        length = int(headers["content-length"])
+    except ValueError:
+        return 400, method, target, {"connection": "close"}, b""
+    if length > MAX_BODY:
+        return 413, method, target, {"connection": "close"}, b""
+    body = await reader.readexactly(length)
+    return None, method, target, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"🔎 Verification service listening on http://{address[0]}:{address[1]}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local certificate verification HTTP service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--records", help="CSV/JSONL file of the issued cert_info records")
+    parser.add_argument("--registry", help="SQLite registry written by certgen.batch --registry")
+    parser.add_argument("--revoked", help="compiled revocation list (path prefix, see certgen.revocation)")
+    parser.add_argument("--key", action="append", dest="keys",
+                        help="public key PEM (repeatable; default: the known key files)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--noise-count", type=int, default=NOISE_INTENSITY)
+    args = parser.parse_args(argv)
+
+    records = ()
+    if args.records:
+        from .records import iter_records
+        records = iter_records(args.records)
+    with worker_pool(args.workers, records, args.keys or PUBLIC_KEY_PATHS, args.noise_count,
+                     registry_path=args.registry, revocation_path=args.revoked) as pool:
+        state_paths = [args.registry, args.registry + "-wal"] if args.registry else []
+        if args.revoked:
+            state_paths.append(args.revoked + BLOOM_SUFFIX)
+        service = VerificationService(pool, args.cache_size, state_paths)
+        try:
+            asyncio.run(serve(service, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
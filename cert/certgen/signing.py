@@ -0,0 +1,89 @@
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding
+
+# ======== Signature Schemes ========
+# rsa-pss-sha512: cert11/cert12، rsa-pss-sha256: cert13، ed25519: امضای ۶۴ بایتی
+# و QR بسیار کوچک‌تر. RSA برای سازگاری با گواهی‌های قبلی باقی می‌ماند.
+RSA_PSS_SHA512 = "rsa-pss-sha512"
+RSA_PSS_SHA256 = "rsa-pss-sha256"
+ED25519 = "ed25519"
+SCHEMES = (RSA_PSS_SHA512, RSA_PSS_SHA256, ED25519)
+DEFAULT_SCHEME = RSA_PSS_SHA512
+
+_RSA_HASHES = {RSA_PSS_SHA512: hashes.SHA512, RSA_PSS_SHA256: hashes.SHA256}
+
+
+def canonical_payload(cert_info):
+    """The exact bytes that get signed: one "key: value" line per field, in order."""
+    return "\n".join(f"{k}: {v}" for k, v in cert_info.items()).encode('utf-8')
+
+
+def key_algorithm(scheme):
+    return "ed25519" if scheme == ED25519 else "rsa"
+
+
+def scheme_for_key(key):
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return ED25519
+    return DEFAULT_SCHEME
+
+
+def _check_scheme(scheme, key):
+    if scheme not in SCHEMES:
+        raise ValueError(f"unknown signature scheme: {scheme}")
+    if (scheme == ED25519) != (scheme_for_key(key) == ED25519):
+        raise ValueError(f"key type does not match signature scheme {scheme}")
+
+
+def _pss(scheme):
+    digest = _RSA_HASHES[scheme]
+    return padding.PSS(mgf=padding.MGF1(digest()), salt_length=padding.PSS.MAX_LENGTH), digest()
+
+
+def sign(private_key, data, scheme=None):
+    scheme = scheme or scheme_for_key(private_key)
+    _check_scheme(scheme, private_key)
+    if scheme == ED25519:
+        return private_key.sign(data)
+    pss, digest = _pss(scheme)
+    return private_key.sign(data, pss, digest)
+
+
+def verify(public_key, signature, data, scheme=None):
+    """True if `signature` is valid. Without a scheme, every scheme the key supports is tried."""
+    if scheme is None:
+        if scheme_for_key(public_key) == ED25519:
+            candidates = [ED25519]
+        else:
+            candidates = [RSA_PSS_SHA512, RSA_PSS_SHA256]
+    else:
+        candidates = [scheme]
+
+    for candidate in candidates:
+        try:
+            _check_scheme(candidate, public_key)
+            if candidate == ED25519:
+                public_key.verify(signature, data)
+            else:
+                pss, digest = _pss(candidate)
+                public_key.verify(signature, data, pss, digest)
+            return True
+        except (InvalidSignature, ValueError):
+            continue
+    return False
+
+# ======== QR Payload ========
+def encode_qr_payload(digital_signature, verification_code, key_id, scheme):
+    return f"{digital_signature}|{verification_code}|{key_id}|{scheme}"
+
+
+def decode_qr_payload(data):
+    """Split a QR payload into (signature_b64, verification_code, key_id, scheme).
+
+    Older certificates carry only the signature, or signature|code(|key_id);
+    missing fields come back as None.
+    """
+    parts = data.split("|")
+    parts += [None] * (4 - len(parts))
+    return tuple(parts[:4])
@@ -0,0 +1,136 @@
+import struct
+
+import numpy as np
+from PIL import Image
+
+# ======== LSB Steganography ========
+# هدر ثابت همیشه در کم‌ارزش‌ترین بیت کانال قرمز ۶۴ پیکسل اول نوشته می‌شود؛
+# پیام بعد از آن در کانال‌ها و تعداد بیت‌های انتخاب‌شده قرار می‌گیرد.
+MAGIC = b"SG"
+HEADER_FORMAT = ">2sBBI"  # magic, channel mask, bits per channel, message length
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+HEADER_PIXELS = HEADER_SIZE * 8
+CHANNELS = "RGB"
+
+
+def _channel_mask(channels):
+    mask = 0
+    for channel in channels.upper():
+        if channel not in CHANNELS:
+            raise ValueError(f"unknown channel: {channel}")
+        mask |= 1 << CHANNELS.index(channel)
+    if not mask:
+        raise ValueError("at least one channel is required")
+    return mask
+
+
+def _channel_indices(mask):
+    return [i for i in range(len(CHANNELS)) if mask & (1 << i)]
+
+
+def _pixels(image):
+    if image.mode not in ("RGB", "RGBA"):
+        raise ValueError(f"unsupported image mode for steganography: {image.mode}")
+    pixels = np.array(image)
+    return pixels, pixels.reshape(-1, pixels.shape[2])
+
+
+def capacity(image, channels="R", bits=1):
+    """Number of message bytes that fit in `image` after the header."""
+    per_pixel = len(_channel_indices(_channel_mask(channels))) * bits
+    return max(0, (image.width * image.height - HEADER_PIXELS) * per_pixel // 8)
+
+
+def embed_message(image, message, channels="R", bits=1):
+    """Return a copy of `image` with `message` (str or bytes) hidden in its low bits.
+
+    The header records the channels and bit depth, so the extractor needs no
+    settings. Raises ValueError if the message does not fit.
+    """
+    if isinstance(message, str):
+        message = message.encode("utf-8")
+    if not 1 <= bits <= 8:
+        raise ValueError("bits per channel must be between 1 and 8")
+    mask = _channel_mask(channels)
+    indices = _channel_indices(mask)
+    if len(message) > capacity(image, channels, bits):
+        raise ValueError(f"message of {len(message)} bytes does not fit in {image.width}x{image.height} image")
+
+    pixels, flat = _pixels(image)
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, mask, bits, len(message))
+    header_bits = np.unpackbits(np.frombuffer(header, dtype=np.uint8))
+    flat[:HEADER_PIXELS, 0] = (flat[:HEADER_PIXELS, 0] & 0xFE) | header_bits
+
+    # بیت‌های پیام به گروه‌های (پیکسل، کانال، بیت) تقسیم و یک‌جا نوشته می‌شوند
+    per_pixel = len(indices) * bits
+    message_bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+    count = -(-message_bits.size // per_pixel)
+    padded = np.zeros(count * per_pixel, dtype=np.uint8)
+    padded[:message_bits.size] = message_bits
+    weights = (1 << np.arange(bits - 1, -1, -1)).astype(np.uint8)
+    values = (padded.reshape(count, len(indices), bits) * weights).sum(axis=2, dtype=np.uint8)
+
+    keep = (0xFF << bits) & 0xFF
+    region = slice(HEADER_PIXELS, HEADER_PIXELS + count)
+    flat[region, indices] = (flat[region, indices] & keep) | values
+    return Image.fromarray(pixels, image.mode)
+
+
+def _rows(image, pixel_count):
+    """(n, channels) array of the first `pixel_count` pixels, reading only the rows that hold them."""
+    rows = min(image.height, -(-pixel_count // image.width))
+    pixels = np.asarray(image.crop((0, 0, image.width, rows)))
+    return pixels.reshape(-1, pixels.shape[2])[:pixel_count]
+
+
+def _read_header(image):
+    if image.width * image.height < HEADER_PIXELS:
+        return None
+    header = np.packbits(_rows(image, HEADER_PIXELS)[:, 0] & 1).tobytes()
+    magic, mask, bits, length = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC or not 0 < mask < 1 << len(CHANNELS) or not 1 <= bits <= 8:
+        return None
+    if length > capacity(image, "".join(CHANNELS[i] for i in _channel_indices(mask)), bits):
+        return None
+    return mask, bits, length
+
+
+def _legacy_message(image, chunk_rows=64):
+    # قالب قدیمی cert13: بیت‌های کانال قرمز پشت‌سرهم، تا اولین بایت NUL
+    message = bytearray()
+    carry = np.zeros(0, dtype=np.uint8)
+    for top in range(0, image.height, chunk_rows):
+        strip = image.crop((0, top, image.width, min(top + chunk_rows, image.height)))
+        bits = np.concatenate([carry, np.asarray(strip.getchannel(0)).reshape(-1) & 1])
+        usable = bits.size - bits.size % 8
+        chunk = np.packbits(bits[:usable]).tobytes()
+        carry = bits[usable:]
+        end = chunk.find(b"\0")
+        if end >= 0:
+            message += chunk[:end]
+            break
+        message += chunk
+    return bytes(message)
+
+
+def extract_message(image, legacy=True):
+    """Bytes hidden by embed_message, or b"" if the image has no header.
+
+    Only the pixels that carry the message are read. With `legacy`, images
+    without a header are read in the old NUL-terminated red-LSB format.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    header = _read_header(image)
+    if header is None:
+        return _legacy_message(image) if legacy else b""
+
+    mask, bits, length = header
+    indices = _channel_indices(mask)
+    per_pixel = len(indices) * bits
+    count = -(-length * 8 // per_pixel)
+    values = _rows(image, HEADER_PIXELS + count)[HEADER_PIXELS:, indices] & ((1 << bits) - 1)
+    shifts = np.arange(bits - 1, -1, -1, dtype=np.uint8)
+    message_bits = ((values[..., None] >> shifts) & 1).reshape(-1)[:length * 8]
+    return np.packbits(message_bits).tobytes()
@@ -0,0 +1,338 @@
+import argparse
+import functools
+import json
+import os
+import string
+import sys
+
+from PIL import Image, ImageDraw
+
+from .effects import smooth_sharpen
+from .instrument import span
+from .noise import apply_noise
+from .watermark import apply_watermarks
+from .keystore import key_id
+from .signing import canonical_payload, encode_qr_payload, scheme_for_key, ED25519
+from .layers import cached_layer, config_hash, file_stamp
+from .pngmeta import certificate_metadata, METADATA_KEY
+from .render import (create_certificate_base, create_official_seal, create_qr_code, load_font,
+                     sign_cert_info, FINAL_FILTER)
+
+# ======== Certificate Templates ========
+# چیدمان گواهی در یک فایل JSON/YAML توصیف می‌شود و یک بار به فهرست رسم کامپایل
+# می‌شود: فونت‌ها بارگذاری، متن‌های ثابت اندازه‌گیری و لایه ثابت (همراه برچسب
+# فیلدها) کش می‌شود؛ برای هر رکورد فقط مقادیر، QR، واترمارک و نویز رسم می‌شوند.
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+TEMPLATE_EXTENSIONS = (".json", ".yaml", ".yml")
+DEFAULT_TEMPLATE = "cert12"
+
+_ANCHORS = {
+    "top-left": (0, 0), "top-right": (1, 0),
+    "bottom-left": (0, 1), "bottom-right": (1, 1),
+    "center": (0.5, 0.5),
+}
+_ALIGN = {"left": 0, "center": 0.5, "right": 1}
+_MEASURE = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def template_path(name):
+    """Path of template `name`: an existing file, or a file in TEMPLATE_DIR."""
+    if os.path.isfile(name):
+        return name
+    for ext in TEMPLATE_EXTENSIONS:
+        path = os.path.join(TEMPLATE_DIR, name + ext)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"no certificate template named {name!r} (looked in {TEMPLATE_DIR})")
+
+
+def read_template(path):
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            # PyYAML فقط برای قالب‌های YAML لازم است
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def is_variable(text):
+    """True if `text` has {field} placeholders filled from the record."""
+    return any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+
+
+def _font_id(font):
+    return [getattr(font, "path", "default"), getattr(font, "size", None)]
+
+
+def anchor_position(at, anchor, size):
+    """Top-left corner of a `size` box whose `anchor` point is at `at`."""
+    fx, fy = _ANCHORS[anchor]
+    return int(at[0] - fx * size[0]), int(at[1] - fy * size[1])
+
+
+def _color(value):
+    return tuple(value) if isinstance(value, list) else value
+
+# ======== Draw Operations ========
+# هر عملیات کامپایل‌شده (نوع، آرگومان‌ها) است؛ پشتیبان raster آن را با
+# (تصویر، draw، context) اجرا می‌کند و certgen.pdf همان فهرست را برداری می‌نویسد.
+# context در لایه ثابت None است.
+def _draw_text(image, draw, context, xy, text, font, fill):
+    draw.text(xy, text, font=font, fill=fill)
+
+
+def _draw_aligned(image, draw, context, at, align, text, font, fill):
+    text = text.format_map(context)
+    x = at[0]
+    if align:
+        x -= draw.textbbox((0, 0), text, font=font)[2] * align
+    draw.text((x, at[1]), text, font=font, fill=fill)
+
+
+def _draw_field(image, draw, context, xy, key, font, fill):
+    draw.text(xy, context[key], font=font, fill=fill)
+
+
+def _draw_chunk(image, draw, context, xy, text, index, width, font, fill):
+    chunk = text.format_map(context)[index * width:(index + 1) * width]
+    if chunk:
+        draw.text(xy, chunk, font=font, fill=fill)
+
+
+def _draw_line(image, draw, context, points, fill, width):
+    draw.line(points, fill=fill, width=width)
+
+
+def _draw_rect(image, draw, context, box, outline, fill, width):
+    draw.rectangle(box, outline=outline, fill=fill, width=width)
+
+
+def _draw_seal(image, draw, context, at, anchor, diameter, font, logo):
+    seal = create_official_seal(diameter, font, logo)
+    image.paste(seal, anchor_position(at, anchor, seal.size), seal)
+
+
+def _draw_qr(image, draw, context, at, anchor, size, version, box_size, fill, back, opacity):
+    if context["scheme"] == ED25519:
+        # payload کوتاه: کوچک‌ترین نسخه QR با ماژول‌هایی که در size جا شوند
+        version, box_size = None, None
+    qr_img = create_qr_code(context["qr_payload"], size, version, box_size, fill, back, opacity)
+    image.paste(qr_img, anchor_position(at, anchor, qr_img.size), qr_img)
+
+
+RASTER_OPS = {
+    "text": _draw_text, "aligned": _draw_aligned, "field": _draw_field, "chunk": _draw_chunk,
+    "line": _draw_line, "rect": _draw_rect, "seal": _draw_seal, "qr": _draw_qr,
+}
+
+
+class Template:
+    """A certificate layout compiled into draw lists.
+
+    Fonts are loaded and static text measured once per template; the static
+    layer (background, frame, seal, fixed text and the field labels for a
+    given set of cert_info keys) is built once and cached by cached_layer.
+    render() then only draws the record-specific values, QR code,
+    watermarks and noise.
+    """
+
+    def __init__(self, spec, source=None):
+        self.spec = spec
+        self.source = source
+        self.name = spec.get("name", "template")
+        self.size = tuple(spec["size"])
+        self.fonts = {name: load_font(file, size) for name, (file, size) in spec["fonts"].items()}
+        self.static_ops = [op for item in spec.get("static", ()) for op in self._compile(item)]
+        self.key = config_hash(
+            spec,
+            {name: _font_id(font) for name, font in sorted(self.fonts.items())},
+            [file_stamp(item["logo"]) for item in spec.get("static", ()) if item.get("logo")],
+        )
+        self._layouts = {}
+
+    def _text(self, text, at, font, fill, align="left"):
+        """Compile a text op: static text is positioned now, variable text at render time."""
+        font, fill, align = self.fonts[font], _color(fill), _ALIGN[align]
+        if is_variable(text):
+            return "aligned", (tuple(at), align, text, font, fill)
+        x = at[0] - _MEASURE.textbbox((0, 0), text, font=font)[2] * align if align else at[0]
+        return "text", ((x, at[1]), text, font, fill)
+
+    def _compile(self, item):
+        kind = item["type"]
+        if kind == "text":
+            return [self._text(item["text"], item["at"], item["font"], item["fill"], item.get("align", "left"))]
+        if kind == "line":
+            points = [tuple(p) for p in item["points"]]
+            return [("line", (points, _color(item["fill"]), item.get("width", 1)))]
+        if kind == "rect":
+            return [("rect", (list(item["box"]), _color(item.get("outline")), _color(item.get("fill")),
+                                  item.get("width", 1)))]
+        if kind == "seal":
+            return [("seal", (item["at"], item.get("anchor", "top-left"), item.get("diameter", 200),
+                                  self.fonts[item["font"]], item.get("logo")))]
+        raise ValueError(f"unknown static element type {kind!r} in template {self.name!r}")
+
+    def layout(self, fields):
+        """(static ops, variable ops) for records whose cert_info keys are `fields`.
+
+        The body is a column of rows laid out top to bottom; since the row
+        positions only depend on the keys, each key set is laid out once.
+        """
+        fields = tuple(fields)
+        compiled = self._layouts.get(fields)
+        if compiled is not None:
+            return compiled
+
+        static, variable = list(self.static_ops), []
+
+        def add(op):
+            (static if op[0] == "text" else variable).append(op)
+
+        body = self.spec.get("body", {})
+        y = body.get("y", 0)
+        for row in body.get("rows", ()):
+            kind = row["type"]
+            if kind == "fields":
+                for key in fields:
+                    add(self._text(f"{key}:", (row["label_x"], y), row["label_font"], row["label_fill"]))
+                    variable.append(("field", ((row["value_x"], y), key, self.fonts[row["value_font"]],
+                                                   _color(row["value_fill"]))))
+                    y += row["step"]
+                continue
+            if kind == "row":
+                add(self._text(row["label"], (row["label_x"], y), row["label_font"], row["label_fill"]))
+                add(self._text(row["value"], (row["value_x"], y), row["value_font"], row["value_fill"]))
+            elif kind == "text":
+                add(self._text(row["text"], (row["x"], y), row["font"], row["fill"], row.get("align", "left")))
+            elif kind == "chunks":
+                # رشته‌های بلند (مثل امضا) در سطرهای هم‌عرض؛ max_lines سطر رزرو می‌شود
+                for i in range(row["max_lines"]):
+                    variable.append(("chunk", ((row["x"], y + i * row["step"]), row["text"], i, row["width"],
+                                                   self.fonts[row["font"]], _color(row["fill"]))))
+                y += row["step"] * (row["max_lines"] - 1)
+            elif kind != "space":
+                raise ValueError(f"unknown body row type {kind!r} in template {self.name!r}")
+            y += row["step"]
+
+        qr = self.spec.get("qr")
+        if qr:
+            variable.append(("qr", (qr["at"], qr.get("anchor", "top-left"), qr.get("size", 220),
+                                        qr.get("version", 7), qr.get("box_size", 10), qr.get("fill", "black"),
+                                        qr.get("back", "white"), qr.get("hologram_opacity", 0.35))))
+
+        compiled = self._layouts[fields] = (static, variable)
+        return compiled
+
+    def build_static_layer(self, fields=()):
+        background = self.spec.get("background", {})
+        texture = background.get("texture", {})
+        image = create_certificate_base(
+            self.size, _color(background.get("color", (255, 255, 255))), background.get("grid"),
+            texture.get("count", 0), texture.get("seed")).convert("RGBA")
+        draw = ImageDraw.Draw(image)
+        for kind, args in self.layout(fields)[0]:
+            RASTER_OPS[kind](image, draw, None, *args)
+        return image
+
+    def static_layer(self, fields=(), final_filter=None):
+        """Cached static layer; in "layers" mode it is stored already filtered."""
+        fields = tuple(fields)
+        key = [self.key, fields]
+        if final_filter == "layers":
+            return cached_layer(f"{self.name}-static-filtered", key,
+                                lambda: smooth_sharpen(self.build_static_layer(fields)))
+        return cached_layer(f"{self.name}-static", key, lambda: self.build_static_layer(fields))
+
+    def record_context(self, cert_info, private_key, scheme=None):
+        """Sign `cert_info`; returns the dict the variable ops are formatted with."""
+        scheme = scheme or scheme_for_key(private_key)
+        digital_signature, verification_code = sign_cert_info(private_key, cert_info, scheme)
+        # Key ID lets the verifier pick the matching public key
+        signer_id = key_id(private_key.public_key())
+        return dict(cert_info, digital_signature=digital_signature, verification_code=verification_code,
+                    key_id=signer_id, scheme=scheme,
+                    qr_payload=encode_qr_payload(digital_signature, verification_code, signer_id, scheme))
+
+    def watermark_options(self, context):
+        """apply_watermarks arguments for this record, or None if the template has none."""
+        watermarks = self.spec.get("watermarks")
+        if not watermarks:
+            return None
+        return dict(
+            texts=[text.format_map(context) for text in watermarks["texts"]],
+            count=watermarks["count"], font=self.fonts[watermarks["font"]], fill=_color(watermarks["fill"]),
+            alpha_range=watermarks.get("alpha_range"), angle_range=watermarks.get("angle_range", (-45, 45)),
+            box=tuple(watermarks.get("box", (400, 40))), offset=tuple(watermarks.get("offset", (10, 10))))
+
+    def metadata(self, cert_info, context):
+        """Signed payload for the PNG iTXt chunk (or the PDF info dictionary)."""
+        return certificate_metadata(canonical_payload(cert_info), context["digital_signature"],
+                                    context["verification_code"], context["key_id"], context["scheme"])
+
+    def render(self, cert_info, private_key, scheme=None, final_filter=FINAL_FILTER):
+        """Render one certificate and return (image, digital_signature, verification_code)."""
+        with span("sign"):
+            context = self.record_context(cert_info, private_key, scheme)
+
+        with span("static-layer"):
+            certificate = self.static_layer(cert_info, final_filter).copy()
+        draw = ImageDraw.Draw(certificate)
+        for kind, args in self.layout(cert_info)[1]:
+            with span("qr" if kind == "qr" else "fields"):
+                RASTER_OPS[kind](certificate, draw, context, *args)
+
+        watermarks = self.watermark_options(context)
+        if watermarks:
+            with span("watermarks"):
+                certificate = apply_watermarks(certificate, **watermarks)
+
+        if final_filter != "layers":
+            with span("filter"):
+                certificate = smooth_sharpen(certificate, final_filter)
+
+        # Anti-forgery noise, reproducible from the Certificate ID
+        noise = self.spec.get("noise")
+        if noise:
+            with span("noise"):
+                certificate = apply_noise(certificate, cert_info["Certificate ID"], noise["count"])
+
+        # Signed payload for the PNG iTXt chunk (written by save_certificate)
+        certificate.info[METADATA_KEY] = self.metadata(cert_info, context)
+
+        return certificate, context["digital_signature"], context["verification_code"]
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled(path, stamp):
+    return Template(read_template(path), path)
+
+
+def load_template(name=DEFAULT_TEMPLATE):
+    """Compiled Template for `name` (see template_path); recompiled when the file changes."""
+    if isinstance(name, Template):
+        return name
+    path = os.path.abspath(template_path(name))
+    return _compiled(path, tuple(file_stamp(path)))
+
+
+def main(argv=None):
+    from .bench import golden_cert_info, golden_key
+    from .render import save_certificate
+
+    parser = argparse.ArgumentParser(description="Render a sample certificate from a template.")
+    parser.add_argument("template", nargs="?", default=DEFAULT_TEMPLATE,
+                        help=f"template name in {TEMPLATE_DIR} or a .json/.yaml file")
+    parser.add_argument("-o", "--output-dir", default=".")
+    args = parser.parse_args(argv)
+
+    template = load_template(args.template)
+    # نمونه با کلید و رکورد ثابت bench؛ نه شناسه واقعی اجاره می‌شود و نه کلیدی روی دیسک نوشته می‌شود
+    cert_info = golden_cert_info()
+    certificate = template.render(cert_info, golden_key())[0]
+    print(f"✅ {template.name}: {save_certificate(certificate, cert_info, args.output_dir)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
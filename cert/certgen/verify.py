@@ -0,0 +1,470 @@
+import argparse
+import base64
+import binascii
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from PIL import Image
+
+from .keystore import load_public_keys, PUBLIC_KEY_PATH, ED25519_PUBLIC_KEY_PATH
+from .records import iter_records, order_cert_info
+from .registry import Registry
+from .revocation import load_revocations, BLOOM_SUFFIX
+from .pngmeta import payload_fields, read_metadata
+from .noise import noise_score, NOISE_MATCH_THRESHOLD
+from .signing import canonical_payload, decode_qr_payload, verify
+from .stego import extract_message
+
+# ======== Batch Verification ========
+# هر تصویر در یک worker باز و فقط یک بار decode می‌شود؛ QR، پیام مخفی، امضا و
+# نویز روی همان تصویر بررسی و زمان هر مرحله جداگانه گزارش می‌شود.
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+PUBLIC_KEY_PATHS = ["public_key.pem", PUBLIC_KEY_PATH, ED25519_PUBLIC_KEY_PATH]
+
+# تعداد نقاط نویز ضدجعل cert12 (باید با NOISE_INTENSITY سازنده گواهی یکی باشد)
+NOISE_INTENSITY = 4500
+FILENAME_PREFIX = "OpenAI_Certificate_"
+
+# گوشه پایین-راست QR در چیدمان هر سازنده: (اندازه تصویر) -> (فاصله از راست، فاصله از پایین)
+# اندازه QR به طول payload بستگی دارد (Ed25519 حدود ۶۹۰ و RSA-4096 حدود ۱۴۵۰ پیکسل در cert12)،
+# پس برش از همان گوشه با اندازه‌های QR_CROP_SIZES به سمت بالا-چپ بزرگ می‌شود.
+QR_LAYOUTS = {
+    (1200, 900): (40, 90),   # cert11/cert12: qr.at در templates/cert1x.json
+    (900, 550): (50, 50),    # cert8/cert9: MARGIN + 20
+    (900, 650): (50, 50),    # cert13: MARGIN + 20
+}
+QR_CROP_SIZES = (240, 720)
+QR_PADDING = 20
+QR_PYRAMID = (2, 4)
+
+
+def iter_images(paths):
+    """Yield image paths from files and directories (walked recursively, sorted)."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for current, dirs, names in os.walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(current, name)
+
+
+def iter_path_list(path):
+    """Yield image paths listed one per line in `path` ("-" for stdin)."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def verification_codes(cert_info):
+    """Every verification code format the generators have used for `cert_info`."""
+    data_string = canonical_payload(cert_info)
+    return {
+        # cert11/cert12
+        f"VER-{hashlib.sha3_256(data_string).hexdigest()[:10].upper()}",
+        # cert13
+        f"VER-{hashlib.sha256(data_string).hexdigest()[:8].upper()}-{cert_info['Certificate ID'][-4:]}",
+    }
+
+
+class RecordIndex:
+    """cert_info lookup by Certificate ID or verification code.
+
+    In-memory records are checked first, then `registry` (a Registry) if given.
+    """
+
+    def __init__(self, records=(), registry=None):
+        self.registry = registry
+        self.by_id = {}
+        self.by_code = {}
+        for record in records:
+            try:
+                # ترتیب فیلدها باید مثل زمان امضا باشد؛ رکورد ناقص کنار گذاشته می‌شود
+                # (verifier نباید تاریخ بسازد یا شناسه اجاره کند)
+                record = order_cert_info(record)
+            except ValueError:
+                continue
+            self.by_id[record["Certificate ID"]] = record
+            for code in verification_codes(record):
+                self.by_code[code] = record
+
+    def find(self, certificate_id=None, verification_code=None):
+        if certificate_id and certificate_id in self.by_id:
+            return self.by_id[certificate_id]
+        record = self.by_code.get(verification_code)
+        if record is None and self.registry is not None:
+            record = self.registry.find(certificate_id, verification_code)
+        return record
+
+# ======== Extraction ========
+def _decode_qr(img):
+    # pyzbar فقط در مسیر decode پیکسل لازم است؛ verify متادیتا بدون zbar هم کار می‌کند
+    from pyzbar.pyzbar import decode
+
+    for obj in decode(img):
+        data = obj.data.decode('utf-8')
+        if data.startswith("-----"):  # کلید عمومی، نه امضا
+            continue
+        return data
+    return None
+
+
+def qr_regions(size):
+    """Crop boxes where the generators put the QR code, most specific first."""
+    width, height = size
+    boxes = []
+    layout = QR_LAYOUTS.get((width, height))
+    if layout:
+        right, bottom = layout
+        x1, y1 = min(width, width - right + QR_PADDING), min(height, height - bottom + QR_PADDING)
+        for qr_size in QR_CROP_SIZES:
+            boxes.append((max(0, x1 - qr_size - 2 * QR_PADDING), max(0, y1 - qr_size - 2 * QR_PADDING), x1, y1))
+        # QR بزرگ‌تر از همه اندازه‌ها: کل ناحیه بالا-چپ گوشه
+        boxes.append((0, 0, x1, y1))
+    else:
+        # همه سازنده‌ها QR را در گوشه پایین-راست می‌گذارند
+        boxes.append((width // 2, height // 2, width, height))
+    seen = set()
+    for box in boxes:
+        if box not in seen:
+            seen.add(box)
+            yield box
+
+
+def locate_qr(img):
+    """(payload, source) where source is "layout", "pyramid", "full" or None if not found.
+
+    The layout crops are tried first, then downscaled copies of the whole
+    image, and the full-resolution frame only as a last resort.
+    """
+    for box in qr_regions(img.size):
+        data = _decode_qr(img.crop(box))
+        if data:
+            return data, "layout"
+    for factor in QR_PYRAMID:
+        if min(img.size) // factor < 100:
+            break
+        data = _decode_qr(img.reduce(factor))
+        if data:
+            return data, "pyramid"
+    data = _decode_qr(img)
+    return data, "full" if data else None
+
+
+def extract_qr_payload(img):
+    return locate_qr(img)[0]
+
+
+def parse_stego_message(message):
+    """"CertificateID:...;VerificationCode:..." -> dict (empty if not in that format)."""
+    fields = {}
+    for part in message.split(";"):
+        key, sep, value = part.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def certificate_id_from_filename(path):
+    if not path:
+        return None
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem[len(FILENAME_PREFIX):] if stem.startswith(FILENAME_PREFIX) else None
+
+# ======== Worker Process ========
+_worker = {}
+
+
+def _init_worker(settings):
+    _worker["keyring"] = load_public_keys(settings["public_key_paths"])
+    # هر worker اتصال فقط‌خواندنی خودش را به registry دارد (WAL خواننده‌ها را قفل نمی‌کند)
+    registry = Registry(settings["registry"], readonly=True) if settings["registry"] else None
+    _worker["records"] = RecordIndex(settings["records"], registry)
+    _worker["noise_count"] = settings["noise_count"]
+    _worker["use_metadata"] = settings["use_metadata"]
+    # فیلتر ابطال mmap می‌شود؛ صفحه‌هایش بین workerها مشترک است
+    _worker.update(revocation_path=settings["revocations"], revocation_stamp=None, revocations=None)
+
+
+def _revocations():
+    # فهرست ابطال با os.replace عوض می‌شود؛ با تغییر inode یا mtime نسخه جدید map می‌شود
+    path = _worker["revocation_path"]
+    if not path:
+        return None
+    try:
+        st = os.stat(path + BLOOM_SUFFIX)
+        stamp = (st.st_ino, st.st_mtime_ns)
+    except OSError:
+        stamp = None
+    if stamp != _worker["revocation_stamp"]:
+        _worker["revocations"] = load_revocations(path)
+        _worker["revocation_stamp"] = stamp
+    return _worker["revocations"]
+
+
+class _Stages:
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.timings[name] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+
+def _signature_bytes(signature_b64):
+    try:
+        return base64.b64decode(signature_b64 or "", validate=True)
+    except binascii.Error:
+        return b""
+
+
+def _check_metadata(result, metadata, keyring, records):
+    # مسیر سریع: امضای داده ذخیره‌شده در چانک PNG، بدون decode پیکسل‌ها
+    key_id, scheme = metadata.get("key_id"), metadata.get("scheme")
+    fields = payload_fields(metadata.get("payload", ""))
+    result.update(mode="metadata", key_id=key_id, scheme=scheme,
+                  certificate_id=fields.get("Certificate ID"))
+    public_key = keyring.get(key_id)
+    if public_key is None:
+        result["error"] = f"no public key for key ID {key_id}"
+        return
+    data_string = metadata["payload"].encode("utf-8")
+    signature_ok = verify(public_key, _signature_bytes(metadata.get("signature")), data_string, scheme)
+
+    # اگر سابقه‌ای برای این گواهی داریم، داده امضاشده باید دقیقاً همان باشد
+    record = records.find(fields.get("Certificate ID"))
+    record_ok = None if record is None else canonical_payload(record) == data_string
+    code_ok = "Certificate ID" in fields and metadata.get("verification_code") in verification_codes(fields)
+
+    result["checks"] = {"signature": signature_ok, "verification_code": code_ok, "record": record_ok}
+    # چانک به پیکسل‌ها بسته نیست و می‌شود آن را روی تصویر دیگری کپی کرد؛ پس فقط «متادیتا معتبر است»
+    ok = signature_ok and code_ok and record_ok is not False
+    result["status"] = "metadata-valid" if ok else "invalid"
+
+
+def _check_revocation(result, revocations):
+    if revocations is None or result["status"] == "error" or not result.get("certificate_id"):
+        return
+    revoked = result["certificate_id"] in revocations
+    result["checks"]["revoked"] = revoked
+    if revoked:
+        result["status"] = "revoked"
+
+
+def verify_image(source, keyring, records, noise_count=NOISE_INTENSITY, use_metadata=True,
+                 name=None, revocations=None):
+    """Verify one certificate image and return a JSON-serialisable result dict.
+
+    `status` is "valid" when the signature checks out against the matching
+    record and every verification code found in the image belongs to it,
+    "invalid" when a check fails, and "error" when the image cannot be read
+    or no record/key matches. With `use_metadata`, a signed certgen PNG
+    chunk is checked instead of decoding pixels and a passing chunk gives
+    "metadata-valid": the chunk is genuine, but nothing ties it to these
+    pixels, so it does not authenticate the image (use --optical for that).
+    A chunk whose Certificate ID differs from the one in the file name, and
+    files without a chunk, take the optical path (QR, stego, noise). `source` is a path or a binary
+    file object; `name` stands in for the path of the latter. Certificates
+    in `revocations` (a RevocationList) get status "revoked".
+    """
+    path = name or (source if isinstance(source, str) else None)
+    result = {"path": path, "status": "error"}
+    stages = _Stages()
+    try:
+        if use_metadata:
+            metadata = read_metadata(source)
+            stages.lap("metadata")
+            claimed = certificate_id_from_filename(path)
+            chunk_id = payload_fields(metadata.get("payload", "")).get("Certificate ID") if metadata else None
+            if metadata is not None and claimed not in (None, chunk_id):
+                # چانک مال گواهی دیگری است؛ تصمیم با بررسی نوری پیکسل‌ها
+                result["metadata_certificate_id"] = chunk_id
+            elif metadata is not None:
+                _check_metadata(result, metadata, keyring, records)
+                stages.lap("signature")
+                _check_revocation(result, revocations)
+                stages.lap("revocation")
+                return result
+
+        result["mode"] = "optical"
+        if hasattr(source, "seek"):
+            source.seek(0)
+        with Image.open(source) as f:
+            img = f.convert("RGBA")
+        stages.lap("decode")
+
+        qr_data, result["qr_source"] = locate_qr(img)
+        stages.lap("qr")
+        if not qr_data:
+            result["error"] = "no signature QR code found"
+            return result
+        signature_b64, qr_code, key_id, scheme = decode_qr_payload(qr_data)
+        result.update(key_id=key_id, scheme=scheme)
+
+        stego = parse_stego_message(extract_message(img).decode('utf-8', errors='replace'))
+        stages.lap("stego")
+
+        certificate_id = stego.get("CertificateID") or certificate_id_from_filename(path)
+        cert_info = records.find(certificate_id, qr_code or stego.get("VerificationCode"))
+        stages.lap("lookup")
+        if cert_info is None:
+            result.update(certificate_id=certificate_id, error="no matching certificate record")
+            return result
+        result["certificate_id"] = cert_info["Certificate ID"]
+
+        # گواهی‌های قدیمی Key ID ندارند؛ همه کلیدهای شناخته‌شده امتحان می‌شوند
+        if key_id:
+            public_keys = [keyring[key_id]] if key_id in keyring else []
+        else:
+            public_keys = list(keyring.values())
+        if not public_keys:
+            result["error"] = f"no public key for key ID {key_id}"
+            return result
+        signature = _signature_bytes(signature_b64)
+        data_string = canonical_payload(cert_info)
+        signature_ok = any(verify(key, signature, data_string, scheme) for key in public_keys)
+        stages.lap("signature")
+
+        expected = verification_codes(cert_info)
+        found = [code for code in (qr_code, stego.get("VerificationCode")) if code]
+        code_ok = all(code in expected for code in found) if found else None
+
+        score = noise_score(img, cert_info["Certificate ID"], noise_count)
+        stages.lap("noise")
+
+        result["checks"] = {
+            "signature": signature_ok,
+            "verification_code": code_ok,
+            "noise": round(score, 3),
+            "noise_match": score >= NOISE_MATCH_THRESHOLD,
+        }
+        result["status"] = "valid" if signature_ok and code_ok is not False else "invalid"
+        _check_revocation(result, revocations)
+        stages.lap("revocation")
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["timings_ms"] = stages.timings
+    return result
+
+
+def verify_one(path):
+    return verify_image(path, _worker["keyring"], _worker["records"], _worker["noise_count"],
+                        _worker["use_metadata"], revocations=_revocations())
+
+
+def verify_data(data, name=None, use_metadata=None):
+    """verify_one for image bytes already in memory (e.g. an upload)."""
+    if use_metadata is None:
+        use_metadata = _worker["use_metadata"]
+    return verify_image(io.BytesIO(data), _worker["keyring"], _worker["records"],
+                        _worker["noise_count"], use_metadata, name=name,
+                        revocations=_revocations())
+
+
+def worker_pool(workers=None, records=(), public_key_paths=PUBLIC_KEY_PATHS,
+                noise_count=NOISE_INTENSITY, use_metadata=True, registry_path=None,
+                revocation_path=None):
+    """ProcessPoolExecutor whose workers hold the keyring, record index and revocation list."""
+    settings = {
+        "records": list(records),
+        "registry": registry_path,
+        "revocations": revocation_path,
+        "public_key_paths": list(public_key_paths),
+        "noise_count": noise_count,
+        "use_metadata": use_metadata,
+    }
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               initializer=_init_worker, initargs=(settings,))
+
+# ======== Batch Driver ========
+def verify_batch(paths, records=(), public_key_paths=PUBLIC_KEY_PATHS, workers=None,
+                 max_pending=None, noise_count=NOISE_INTENSITY, use_metadata=True,
+                 registry_path=None, revocation_path=None):
+    """Verify every image in `paths` across a process pool, yielding results in completion order."""
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+
+    with worker_pool(workers, records, public_key_paths, noise_count, use_metadata,
+                     registry_path, revocation_path) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(verify_one, path))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+
+
+def build_parser(description="Verify certificate images in batch."):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("paths", nargs="*", help="certificate images or directories")
+    parser.add_argument("--list", help="file with one image path per line ('-' for stdin)")
+    parser.add_argument("--records", help="CSV/JSONL file of the issued cert_info records")
+    parser.add_argument("--registry", help="SQLite registry written by certgen.batch --registry")
+    parser.add_argument("--revoked", help="compiled revocation list (path prefix, see certgen.revocation)")
+    parser.add_argument("--key", action="append", dest="keys",
+                        help="public key PEM (repeatable; default: the known key files)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", help="write JSONL results here instead of stdout")
+    parser.add_argument("--noise-count", type=int, default=NOISE_INTENSITY)
+    parser.add_argument("--optical", action="store_true",
+                        help="ignore the PNG metadata chunk and always check QR/stego/noise "
+                             "(the chunk alone only gives metadata-valid)")
+    return parser
+
+
+def run(args, default_records=()):
+    paths = iter_images(args.paths)
+    if args.list:
+        paths = iter_path_list(args.list)
+    if args.records:
+        records = iter_records(args.records)
+    else:
+        records = default_records
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {"valid": 0, "metadata-valid": 0, "invalid": 0, "revoked": 0, "error": 0}
+    start = time.perf_counter()
+    try:
+        for result in verify_batch(paths, records, args.keys or PUBLIC_KEY_PATHS, args.workers,
+                                   noise_count=args.noise_count, use_metadata=not args.optical,
+                                   registry_path=args.registry, revocation_path=args.revoked):
+            counts[result["status"]] += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {counts['valid']} valid, 🏷️ {counts['metadata-valid']} metadata-valid, "
+          f"❌ {counts['invalid']} invalid, 🚫 {counts['revoked']} revoked, "
+          f"⚠️ {counts['error']} errors in {elapsed:.1f}s", file=sys.stderr)
+    return 1 if counts["invalid"] or counts["revoked"] or counts["error"] else 0
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import collections
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# ======== Watermark Sprite Atlas ========
+# هر متن واترمارک فقط یک بار برای هر زاویه کوانتیزه‌شده رسم و چرخانده می‌شود؛
+# همه جای‌گذاری‌ها سپس در یک ترکیب آلفای واحد روی گواهی اعمال می‌شوند.
+ANGLE_STEP = 3
+# متن‌های هر رکورد (شناسه، کد تأیید) هر بار sprite تازه می‌سازند؛ حافظه کش با LRU محدود
+# می‌شود تا worker طولانی‌مدت رشد نکند. متن‌های ثابت در هر گواهی استفاده می‌شوند و می‌مانند.
+SPRITE_CACHE_BYTES = 96 * 1024 * 1024
+
+
+class WatermarkAtlas:
+    """Rotated coverage masks for watermark strings, keyed by (text, angle).
+
+    The least recently used sprites are dropped once they take more than
+    `max_bytes`.
+    """
+
+    def __init__(self, font, box=(400, 40), offset=(10, 10), angle_step=ANGLE_STEP,
+                 resample=Image.BICUBIC, max_bytes=SPRITE_CACHE_BYTES):
+        self.font = font
+        self.box = box
+        self.offset = offset
+        self.angle_step = angle_step
+        self.resample = resample
+        self.max_bytes = max_bytes
+        self.sprites = collections.OrderedDict()
+        self.nbytes = 0
+
+    def quantize(self, angle):
+        return round(angle / self.angle_step) * self.angle_step
+
+    def sprite(self, text, angle):
+        key = (text, self.quantize(angle))
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        mask = Image.new("L", self.box, 0)
+        ImageDraw.Draw(mask).text(self.offset, text, font=self.font, fill=255)
+        mask = mask.rotate(key[1], expand=True, resample=self.resample)
+        sprite = np.asarray(mask, dtype=np.float32) / 255
+        self.sprites[key] = sprite
+        self.nbytes += sprite.nbytes
+        while self.nbytes > self.max_bytes and len(self.sprites) > 1:
+            self.nbytes -= self.sprites.popitem(last=False)[1].nbytes
+        return sprite
+
+    def prerender(self, texts, angle_range):
+        low, high = (self.quantize(a) for a in angle_range)
+        for text in texts:
+            for angle in range(low, high + 1, self.angle_step):
+                self.sprite(text, angle)
+
+
+_atlases = {}
+
+
+def get_atlas(font, box=(400, 40), offset=(10, 10), angle_step=ANGLE_STEP,
+              resample=Image.BICUBIC):
+    key = (getattr(font, "path", id(font)), getattr(font, "size", None),
+           tuple(box), tuple(offset), angle_step, resample)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = WatermarkAtlas(font, box, offset, angle_step, resample)
+    return atlas
+
+
+def watermark_placements(size, texts, count, atlas, fill, alpha_range=None,
+                         angle_range=(-45, 45), region=None, rng=random):
+    """Yield (text, alpha, quantized angle, x, y, sprite) for `count` watermarks.
+
+    Placements are drawn from `rng` in the same order as the old paste loop
+    (text, alpha, angle, x, y). Without `region`, each sprite is placed fully
+    inside the image; with `region=(x0, y0, x1, y1)` its top-left corner is
+    drawn from that range.
+    """
+    width, height = size
+    for _ in range(count):
+        text = rng.choice(texts)
+        alpha = rng.randint(*alpha_range) if alpha_range else fill[3]
+        angle = rng.uniform(*angle_range)
+        sprite = atlas.sprite(text, angle)
+        h, w = sprite.shape
+
+        if region is None:
+            x = rng.randint(0, width - w)
+            y = rng.randint(0, height - h)
+        else:
+            x = rng.randint(region[0], region[2])
+            y = rng.randint(region[1], region[3])
+        yield text, alpha, atlas.quantize(angle), x, y, sprite
+
+
+def apply_watermarks(image, texts, count, font, fill, alpha_range=None,
+                     angle_range=(-45, 45), box=(400, 40), offset=(10, 10),
+                     region=None, resample=Image.BICUBIC, rng=random):
+    """Return a copy of `image` with `count` randomly placed rotated watermarks.
+
+    See watermark_placements; sprites are clipped at the image edge.
+    """
+    atlas = get_atlas(font, box, offset, resample=resample)
+    width, height = image.size
+
+    # ضریب عبور نور؛ ترکیب پشت‌سرهم چند لایه هم‌رنگ = 1 - حاصل‌ضرب (1 - alpha)
+    transmittance = np.ones((height, width), dtype=np.float32)
+    for text, alpha, angle, x, y, sprite in watermark_placements(
+            image.size, texts, count, atlas, fill, alpha_range, angle_range, region, rng):
+        h, w = sprite.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, width), min(y + h, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        coverage = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+        transmittance[y0:y1, x0:x1] *= 1 - coverage * (alpha / 255)
+
+    pixels = np.array(image)
+    opacity = (1 - transmittance)[..., None]
+    rgb = pixels[..., :3].astype(np.float32)
+    rgb += (np.asarray(fill[:3], dtype=np.float32) - rgb) * opacity
+    pixels[..., :3] = np.rint(rgb).astype(np.uint8)
+    return Image.fromarray(pixels, image.mode)
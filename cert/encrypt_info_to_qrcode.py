@@ -1,11 +1,40 @@
-import qrcode
+import argparse
 import base64
 import json
+import os
+import re
+import struct
+import sys
+import time
+
+import qrcode
 from crypto.Cipher import AES
+from crypto.Hash import SHA256
 from crypto.Random import get_random_bytes
 from crypto.Protocol.KDF import PBKDF2
 from crypto.Util.Padding import pad
 
+# ========== تنظیمات ==========
+# قالب باینری: version | salt | nonce | tag | ciphertext
+# کلید با PBKDF2 فقط یک بار برای هر salt (یعنی هر batch) مشتق می‌شود و هر رکورد
+# nonce یکتای خودش را دارد؛ پس هزینه هر رکورد فقط AES-GCM است، نه ۱۰۰هزار دور PBKDF2.
+PAYLOAD_VERSION = 1
+SALT_SIZE = 16
+NONCE_SIZE = 12
+TAG_SIZE = 16
+KDF_ITERATIONS = 100000
+KEY_SIZE = 32
+PASSWORD = "ysn2025secure"  # رمز عبور دلخواه شما
+PASSWORD_ENV = "CERTGEN_QR_PASSWORD"
+
+_HEADER = struct.Struct(f"B{SALT_SIZE}s{NONCE_SIZE}s{TAG_SIZE}s")
+# نام فایل فقط از این نویسه‌ها ساخته می‌شود تا Certificate ID نتواند از output-dir بیرون برود
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+# گزینه باینری zbar (0.23.1+) در pyzbar نیست و decode عمومی راهی برای روشن کردنش ندارد؛
+# اسکن باینری به توابع داخلی pyzbar تکیه دارد و فقط وقتی همه موجودند به کار می‌رود
+ZBAR_CFG_BINARY = 4
+_PYZBAR_INTERNALS = ("_pixel_data", "_image_scanner", "_image", "_decode_symbols", "_symbols_for_image", "_FOURCC")
+
 # ========== مرحله ۱: اطلاعات یاسین ==========
 cert_info = {
     "Name": "Yasin",
@@ -18,29 +47,208 @@ cert_info = {
     "Model ID": "GPT4O-REP-TRUST-2025",
     "Issuer": "OpenAI, Inc."
 }
-data_json = json.dumps(cert_info).encode("utf-8")
 
 # ========== مرحله ۲: رمزنگاری AES ==========
-password = "ysn2025secure"  # رمز عبور دلخواه شما
-salt = get_random_bytes(16)
-key = PBKDF2(password, salt, dkLen=32, count=100000)  # کلید مشتق‌شده
-
-cipher = AES.new(key, AES.MODE_CBC)
-ciphertext = cipher.encrypt(pad(data_json, AES.block_size))
-
-# ترکیب IV، salt و ciphertext برای رمزگشایی بعدی
-payload = {
-    "salt": base64.b64encode(salt).decode(),
-    "iv": base64.b64encode(cipher.iv).decode(),
-    "data": base64.b64encode(ciphertext).decode()
-}
-payload_json = json.dumps(payload)
+def derive_key(password, salt):
+    return PBKDF2(password, salt, dkLen=KEY_SIZE, count=KDF_ITERATIONS, hmac_hash_module=SHA256)
+
+
+def record_bytes(record):
+    # JSON فشرده؛ ترتیب کلیدها همان ترتیب رکورد می‌ماند
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class BatchEncryptor:
+    """AES-256-GCM for a batch of records under one PBKDF2-derived key.
+
+    Nonces are a random 4-byte prefix plus a 64-bit counter, so they never
+    repeat within a batch. The version byte and salt are authenticated as
+    associated data.
+    """
+
+    def __init__(self, password=PASSWORD, salt=None):
+        self.salt = salt or get_random_bytes(SALT_SIZE)
+        self.key = derive_key(password, self.salt)
+        self.prefix = get_random_bytes(NONCE_SIZE - 8)
+        self.counter = 0
+
+    def encrypt(self, data):
+        nonce = self.prefix + self.counter.to_bytes(8, "big")
+        self.counter += 1
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce, mac_len=TAG_SIZE)
+        cipher.update(bytes([PAYLOAD_VERSION]) + self.salt)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return _HEADER.pack(PAYLOAD_VERSION, self.salt, nonce, tag) + ciphertext
+
+    def encrypt_record(self, record):
+        return self.encrypt(record_bytes(record))
+
+
+def decrypt_payload(payload, password=PASSWORD, keys=None):
+    """Plaintext bytes of a version-1 payload; raises ValueError if it was tampered with.
+
+    `keys` (a dict) caches derived keys by salt, so decrypting a whole batch
+    also runs PBKDF2 only once.
+    """
+    if len(payload) < _HEADER.size:
+        raise ValueError("payload too short")
+    version, salt, nonce, tag = _HEADER.unpack_from(payload)
+    if version != PAYLOAD_VERSION:
+        raise ValueError(f"unsupported payload version: {version}")
+    keys = {} if keys is None else keys
+    key = keys.get(salt)
+    if key is None:
+        key = keys[salt] = derive_key(password, salt)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce, mac_len=TAG_SIZE)
+    cipher.update(bytes([version]) + salt)
+    return cipher.decrypt_and_verify(payload[_HEADER.size:], tag)
+
+
+def decrypt_record(payload, password=PASSWORD, keys=None):
+    return json.loads(decrypt_payload(payload, password, keys))
+
+
+def encrypt_legacy(record, password=PASSWORD):
+    """Original format: AES-CBC without authentication, base64 fields in JSON (one PBKDF2 per record)."""
+    salt = get_random_bytes(16)
+    key = PBKDF2(password, salt, dkLen=32, count=KDF_ITERATIONS)  # کلید مشتق‌شده
+
+    cipher = AES.new(key, AES.MODE_CBC)
+    ciphertext = cipher.encrypt(pad(json.dumps(record).encode("utf-8"), AES.block_size))
+
+    # ترکیب IV، salt و ciphertext برای رمزگشایی بعدی
+    payload = {
+        "salt": base64.b64encode(salt).decode(),
+        "iv": base64.b64encode(cipher.iv).decode(),
+        "data": base64.b64encode(ciphertext).decode()
+    }
+    return json.dumps(payload)
 
 # ========== مرحله ۳: ساخت QR Code ==========
-qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_Q)
-qr.add_data(payload_json)
-qr.make(fit=True)
-img = qr.make_image(fill_color="#001133", back_color="white")
-img.save("encrypted_yasin_qrcode.png")
+def make_qr_image(payload):
+    # bytes در حالت 8-bit (بدون base64) نوشته می‌شود
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_Q)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="#001133", back_color="white")
+
+
+def qr_filename(record, output_dir=".", index=0):
+    """File name for `record`'s QR inside `output_dir`.
+
+    The Certificate ID is reduced to letters, digits, ".", "_" and "-";
+    when it is missing (or nothing is left) the row index is used instead.
+    """
+    certificate_id = _UNSAFE_FILENAME.sub("_", str(record.get("Certificate ID") or "")).strip("._")
+    return os.path.join(output_dir, f"encrypted_{certificate_id or f'record-{index:05d}'}_qrcode.png")
+
+
+def _scan_binary(image, pyzbar):
+    """QR payloads from a zbar scan with ZBAR_CFG_BINARY, or None when zbar rejects the option."""
+    from ctypes import c_void_p, cast
+    from pyzbar.wrapper import (ZBarConfig, ZBarSymbol, zbar_image_scanner_set_config, zbar_image_set_data,
+                                zbar_image_set_format, zbar_image_set_size, zbar_scan_image)
+
+    pixels, width, height = pyzbar._pixel_data(image)
+    with pyzbar._image_scanner() as scanner:
+        for symbol in ZBarSymbol:
+            zbar_image_scanner_set_config(scanner, symbol, ZBarConfig.CFG_ENABLE, int(symbol == ZBarSymbol.QRCODE))
+        if zbar_image_scanner_set_config(scanner, ZBarSymbol.QRCODE, ZBAR_CFG_BINARY, 1):
+            return None
+        with pyzbar._image() as img:
+            zbar_image_set_format(img, pyzbar._FOURCC["L800"])
+            zbar_image_set_size(img, width, height)
+            zbar_image_set_data(img, cast(pixels, c_void_p), len(pixels), None)
+            if zbar_scan_image(scanner, img) < 0:
+                raise pyzbar.PyZbarError("Unsupported image format")
+            return [decoded.data for decoded in pyzbar._decode_symbols(pyzbar._symbols_for_image(img))]
+
+
+def read_qr_payload(image):
+    """Raw bytes of the first QR code in `image` (a PIL image or file name), or None.
+
+    zbar may convert QR byte-mode data to text with a guessed charset, which
+    corrupts binary payloads, so the scan enables ZBAR_CFG_BINARY when this
+    pyzbar still has the internals needed and zbar accepts the option.
+    Otherwise it falls back to pyzbar.pyzbar.decode.
+    """
+    from PIL import Image
+    from pyzbar import pyzbar
+
+    if isinstance(image, str):
+        image = Image.open(image)
+    payloads = None
+    if all(hasattr(pyzbar, name) for name in _PYZBAR_INTERNALS):
+        payloads = _scan_binary(image, pyzbar)
+    if payloads is None:
+        payloads = [decoded.data for decoded in pyzbar.decode(image, symbols=[pyzbar.ZBarSymbol.QRCODE])]
+    return payloads[0] if payloads else None
+
+
+def encrypt_batch(records, password=PASSWORD, output_dir=".", write_payloads=False):
+    """Encrypt `records` under one derived key and save a QR per record; yields the file names."""
+    os.makedirs(output_dir, exist_ok=True)
+    encryptor = BatchEncryptor(password)
+    for index, record in enumerate(records):
+        payload = encryptor.encrypt_record(record)
+        filename = qr_filename(record, output_dir, index)
+        make_qr_image(payload).save(filename)
+        if write_payloads:
+            with open(os.path.splitext(filename)[0] + ".bin", "wb") as f:
+                f.write(payload)
+        yield filename
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt cert_info records into QR codes (AES-256-GCM).")
+    parser.add_argument("records", nargs="?", help="CSV or JSONL records (default: the sample record above)")
+    parser.add_argument("-o", "--output-dir", default=".")
+    parser.add_argument("--password", default=None, help=f"default: ${PASSWORD_ENV} or the built-in password")
+    parser.add_argument("--payloads", action="store_true", help="also write each binary payload as .bin")
+    parser.add_argument("--legacy", action="store_true",
+                        help="single-record AES-CBC JSON payload (the original format)")
+    parser.add_argument("--decrypt", nargs="+", metavar="PNG",
+                        help="read these QR images and print the decrypted records as JSON lines")
+    args = parser.parse_args(argv)
+    password = args.password or os.environ.get(PASSWORD_ENV) or PASSWORD
+    if args.legacy and (args.records or args.decrypt):
+        parser.error("--legacy encrypts only the built-in sample record")
+
+    if args.decrypt:
+        keys = {}
+        failed = 0
+        for filename in args.decrypt:
+            payload = read_qr_payload(filename)
+            try:
+                if payload is None:
+                    raise ValueError("no QR code found")
+                print(json.dumps(decrypt_record(payload, password, keys), ensure_ascii=False))
+            except ValueError as e:
+                failed += 1
+                print(f"❌ {filename}: {e}", file=sys.stderr)
+        return 1 if failed else 0
+
+    if args.legacy:
+        os.makedirs(args.output_dir, exist_ok=True)
+        filename = os.path.join(args.output_dir, "encrypted_yasin_qrcode.png")
+        make_qr_image(encrypt_legacy(cert_info, password)).save(filename)
+        print(f"✅ QR رمزنگاری‌شده ساخته شد و در فایل '{filename}' ذخیره شد.")
+        return 0
+
+    if args.records:
+        from certgen.records import iter_records
+        records = iter_records(args.records)
+    else:
+        records = [cert_info]
+
+    start = time.perf_counter()
+    count = 0
+    for filename in encrypt_batch(records, password, args.output_dir, args.payloads):
+        count += 1
+        print(f"✅ {filename}")
+    print(f"🔐 {count} QR codes in {time.perf_counter() - start:.2f}s (one key derivation)", file=sys.stderr)
+    return 0
+
 
-print("✅ QR رمزنگاری‌شده ساخته شد و در فایل 'encrypted_yasin_qrcode.png' ذخیره شد.")
+if __name__ == "__main__":
+    sys.exit(main())
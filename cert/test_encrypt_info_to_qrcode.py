@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+# رفت و برگشت کامل: رمزنگاری، ساخت QR، خواندن bytes با zbar و رمزگشایی.
+# بدون pycryptodome، qrcode یا pyzbar (و کتابخانه libzbar) رد می‌شود.
+try:
+    import encrypt_info_to_qrcode as qr
+    from pyzbar import pyzbar  # noqa: F401 (libzbar همین‌جا بارگذاری می‌شود)
+except ImportError as e:
+    qr, SKIP_REASON = None, f"QR round trip needs pycryptodome, qrcode and zbar: {e}"
+else:
+    SKIP_REASON = None
+
+
+@unittest.skipIf(qr is None, SKIP_REASON)
+class QrRoundTripTest(unittest.TestCase):
+    def test_encrypt_render_decode_decrypt(self):
+        records = [qr.cert_info, dict(qr.cert_info, **{"Name": "یاسین", "Certificate ID": "../escape"})]
+        with tempfile.TemporaryDirectory() as output_dir:
+            filenames = list(qr.encrypt_batch(records, "test-password", output_dir, write_payloads=True))
+            self.assertEqual([os.path.dirname(name) for name in filenames], [output_dir] * 2)
+            keys = {}
+            for record, filename in zip(records, filenames):
+                with open(os.path.splitext(filename)[0] + ".bin", "rb") as f:
+                    payload = f.read()
+                self.assertEqual(qr.read_qr_payload(filename), payload)
+                self.assertEqual(qr.decrypt_record(payload, "test-password", keys), record)
+
+
+if __name__ == "__main__":
+    unittest.main()